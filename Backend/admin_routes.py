@@ -1,11 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, g, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Event, VendorApplication, Payment
+from models import db, User, Event, VendorApplication, Payment, MonthKey
+from cache import TTLCache
+from auth_routes import invalidate_user
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, extract
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+import csv
+import io
+from sqlalchemy import func, and_, extract, case, exists, select, bindparam, union_all, literal_column
+from sqlalchemy.orm import selectinload, raiseload, contains_eager, joinedload, undefer_group
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 
 admin_bp = Blueprint('admin', __name__)
 
+# user_id -> role, so hot admins don't hit the database on every request
+_admin_role_cache = TTLCache(maxsize=1024, ttl=30)
+
 
 def _current_user_id():
     try:
@@ -14,40 +25,248 @@ def _current_user_id():
         return None
 
 
-def check_admin():
-    """Check if current user is admin"""
-    current_user_id = _current_user_id()
-    if current_user_id is None:
-        return False
-    user = User.query.get(current_user_id)
-    return user and user.role == 'admin'
+def _current_admin_id():
+    """Return the current user's id if they are an admin, checking once per request"""
+    if 'admin_id' not in g:
+        current_user_id = _current_user_id()
+        role = None
+        if current_user_id is not None:
+            role = _admin_role_cache.get(current_user_id)
+            if role is None:
+                # Only the role is needed, so avoid hydrating the whole User row
+                role = db.session.query(User.role).filter(User.id == current_user_id).scalar()
+                if role is not None:
+                    _admin_role_cache.set(current_user_id, role)
+        g.admin_id = current_user_id if role == 'admin' else None
+    return g.admin_id
 
 
-def get_current_admin_id():
-    current_user_id = _current_user_id()
-    if current_user_id is None:
-        return None
-    user = User.query.get(current_user_id)
-    if not user or user.role != 'admin':
-        return None
-    return user.id
+def invalidate_admin(user_id):
+    """Forget the cached role for a user whose account was changed"""
+    _admin_role_cache.pop(user_id)
 
 
 def normalize_currency_options(raw_options, default_currency='USD'):
     if not raw_options:
         return default_currency.upper()
     if isinstance(raw_options, list):
-        values = raw_options
-    else:
-        values = str(raw_options).split(',')
+        raw_options = ','.join(str(value) for value in raw_options)
+    return _normalize_currency_options(str(raw_options), default_currency)
+
+
+@lru_cache(maxsize=512)
+def _normalize_currency_options(raw_options, default_currency):
     cleaned = []
-    for value in values:
-        code = str(value).strip().upper()
+    for value in raw_options.split(','):
+        code = value.strip().upper()
         if code in ('EURO', 'EUROS'):
             code = 'EUR'
         if code and code not in cleaned:
             cleaned.append(code)
     return ','.join(cleaned or [default_currency.upper()])
+
+
+def _money(value):
+    """Parse a fee from request JSON into an exact two-decimal amount
+
+    Raises InvalidOperation for anything that isn't a finite number.
+    """
+    amount = Decimal(str(value or 0))
+    if not amount.is_finite():
+        raise InvalidOperation(value)
+    return amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+@lru_cache(maxsize=512)
+def _parse_currency_set(currency_options):
+    """Parse a stored comma-separated currency list into a set for membership checks"""
+    return frozenset(c.strip() for c in (currency_options or '').split(',') if c.strip())
+
+def _create_pending_payments(applications):
+    """Insert pending payments for approved applications, skipping any that already have one"""
+    rows = [{
+        'application_id': application.id,
+        'vendor_id': application.vendor_id,
+        'amount': application.event.vendor_fee,
+        'status': 'pending'
+    } for application in applications]
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql.insert(Payment).on_conflict_do_nothing(
+            index_elements=['application_id']
+        )
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(Payment).on_conflict_do_nothing(
+            index_elements=['application_id']
+        )
+    elif dialect == 'mysql':
+        stmt = mysql.insert(Payment)
+        stmt = stmt.on_duplicate_key_update(application_id=stmt.inserted.application_id)
+    else:
+        existing = {application_id for application_id, in db.session.query(Payment.application_id).filter(
+            Payment.application_id.in_([row['application_id'] for row in rows])
+        )}
+        db.session.add_all([Payment(**row) for row in rows if row['application_id'] not in existing])
+        return
+    # A single executemany round-trip for any number of approvals, and the
+    # unique index on application_id settles concurrent approvals instead
+    # of a read-before-write check
+    db.session.execute(stmt, rows)
+
+def _not_found_or_denied(model, object_id, not_found_message):
+    """Error response for a row that the ownership-scoped lookup didn't return"""
+    if db.session.get(model, object_id) is None:
+        return jsonify({'error': not_found_message}), 404
+    return jsonify({'error': 'Access denied for this event'}), 403
+
+
+def _payment_row_to_dict(row):
+    """Serialize a projected payment row the same way as Payment.to_dict()"""
+    return row._asdict()
+
+
+def _stream_json_array(items):
+    yield '['
+    for index, item in enumerate(items):
+        if index:
+            yield ','
+        yield current_app.json.dumps(item)
+    yield ']'
+
+
+# Leading characters spreadsheets read as the start of a formula
+_CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_cell(value):
+    # Vendor-supplied text like "=HYPERLINK(...)" must open as text, not run
+    if isinstance(value, str) and value.startswith(_CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _stream_csv(result, chunk_size=64 * 1024):
+    """Write a result's rows as CSV, handing out roughly chunk_size characters at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(result.keys())
+    for row in result:
+        writer.writerow([_csv_cell(value) for value in row])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _csv_response(result, filename):
+    return Response(
+        stream_with_context(_stream_csv(result)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+# ============= ADMIN-SCOPED STATEMENTS =============
+# Built once at import and executed with an admin_id parameter, so hot
+# endpoints reuse the same statement (and its cached compilation) instead
+# of rebuilding the expression tree on every request.
+_application_counts = select(
+    VendorApplication.event_id,
+    func.count(VendorApplication.id).label('application_count'),
+    func.sum(case((VendorApplication.status == 'approved', 1), else_=0)).label('approved_vendors')
+).join(Event, VendorApplication.event_id == Event.id).where(
+    Event.created_by_admin_id == bindparam('admin_id')
+).group_by(VendorApplication.event_id).subquery()
+
+_EVENTS_WITH_APPLICATION_COUNTS = select(
+    Event,
+    func.coalesce(_application_counts.c.application_count, 0),
+    func.coalesce(_application_counts.c.approved_vendors, 0)
+).outerjoin(
+    _application_counts, _application_counts.c.event_id == Event.id
+).where(
+    Event.created_by_admin_id == bindparam('admin_id')
+).options(
+    undefer_group('long_text'), joinedload(Event.created_by_admin)
+).order_by(Event.event_date.desc())
+
+_PAYMENT_ROWS = select(
+    *(getattr(Payment, name) for name in Payment._DICT_FIELDS),
+    User.full_name.label('vendor_name')
+).join(VendorApplication, Payment.application_id == VendorApplication.id).join(
+    Event, VendorApplication.event_id == Event.id
+).outerjoin(
+    User, Payment.vendor_id == User.id
+).where(
+    Event.created_by_admin_id == bindparam('admin_id')
+).order_by(Payment.created_at.desc())
+
+# Vendor listing as plain rows carrying the User.to_dict() fields; the
+# JSON encoder walks them directly, no User objects are built
+_VENDOR_ROWS = select(
+    *(getattr(User, name) for name in User._DICT_FIELDS)
+).where(
+    User.role == 'vendor'
+).order_by(User.created_at.desc())
+
+# Application export: the serialized columns plus the vendor and event
+# names, read as plain rows for the CSV writer
+_APPLICATION_EXPORT_ROWS = select(
+    *(getattr(VendorApplication, name) for name in VendorApplication._DICT_FIELDS),
+    User.full_name.label('vendor_name'),
+    User.company_name.label('vendor_company'),
+    Event.name.label('event_name'),
+    Event.event_date
+).join(
+    Event, VendorApplication.event_id == Event.id
+).outerjoin(
+    User, VendorApplication.vendor_id == User.id
+).where(
+    Event.created_by_admin_id == bindparam('admin_id')
+).order_by(VendorApplication.applied_at.desc())
+
+_APPLICATION_STATUS_COUNTS = select(
+    VendorApplication.status,
+    func.count(VendorApplication.id)
+).join(Event, VendorApplication.event_id == Event.id).where(
+    Event.created_by_admin_id == bindparam('admin_id')
+).group_by(VendorApplication.status)
+
+def _month_key(column):
+    return MonthKey(column).label('key')
+
+# One round trip for the dashboard charts: each branch does its own GROUP BY
+# and tags its rows with a discriminator in the ``kind`` column
+_ANALYTICS_DASHBOARD = union_all(
+    select(
+        literal_column("'status'").label('kind'),
+        VendorApplication.status.label('key'),
+        func.count(VendorApplication.id).label('value')
+    ).join(Event, VendorApplication.event_id == Event.id).where(
+        Event.created_by_admin_id == bindparam('admin_id')
+    ).group_by(VendorApplication.status),
+    select(
+        literal_column("'applications'").label('kind'),
+        _month_key(VendorApplication.applied_at),
+        func.count(VendorApplication.id).label('value')
+    ).join(Event, VendorApplication.event_id == Event.id).where(
+        Event.created_by_admin_id == bindparam('admin_id'),
+        VendorApplication.applied_at >= bindparam('since')
+    ).group_by('key'),
+    select(
+        literal_column("'revenue'").label('kind'),
+        _month_key(Payment.payment_date),
+        func.sum(Payment.amount).label('value')
+    ).join(VendorApplication, Payment.application_id == VendorApplication.id).join(
+        Event, VendorApplication.event_id == Event.id
+    ).where(
+        Event.created_by_admin_id == bindparam('admin_id'),
+        Payment.status == 'completed',
+        Payment.payment_date >= bindparam('since')
+    ).group_by('key')
+).order_by(literal_column('kind'), literal_column('key'))
 
 # ============= VENDOR MANAGEMENT =============
 @admin_bp.route('/vendors', methods=['GET'])
@@ -55,11 +274,11 @@ def normalize_currency_options(raw_options, default_currency='USD'):
 def get_all_vendors():
     """Get all vendors"""
     try:
-        if not check_admin():
+        if _current_admin_id() is None:
             return jsonify({'error': 'Access denied'}), 403
         
-        vendors = User.query.filter_by(role='vendor').order_by(User.created_at.desc()).all()
-        return jsonify([vendor.to_dict() for vendor in vendors]), 200
+        rows = db.session.execute(_VENDOR_ROWS)
+        return jsonify([row._asdict() for row in rows]), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -69,23 +288,26 @@ def get_all_vendors():
 def get_vendor_details(vendor_id):
     """Get detailed vendor information"""
     try:
-        if not check_admin():
+        if _current_admin_id() is None:
             return jsonify({'error': 'Access denied'}), 403
         
-        vendor = User.query.get(vendor_id)
+        # Load applications (with their events) and payments alongside the
+        # vendor so serializing them doesn't lazy-load row by row.
+        load_options = [
+            selectinload(User.applications).undefer_group('long_text'),
+            selectinload(User.applications).selectinload(VendorApplication.event),
+            selectinload(User.payments).undefer_group('long_text')
+        ]
+        if current_app.debug:
+            load_options.append(raiseload('*', sql_only=True))
+        vendor = db.session.get(User, vendor_id, options=load_options)
         if not vendor or vendor.role != 'vendor':
             return jsonify({'error': 'Vendor not found'}), 404
         
-        # Get vendor's applications
-        applications = VendorApplication.query.filter_by(vendor_id=vendor_id).all()
-        
-        # Get vendor's payments
-        payments = Payment.query.filter_by(vendor_id=vendor_id).all()
-        
         return jsonify({
             'vendor': vendor.to_dict(),
-            'applications': [app.to_dict() for app in applications],
-            'payments': [payment.to_dict() for payment in payments]
+            'applications': [app.to_dict() for app in vendor.applications],
+            'payments': [payment.to_dict() for payment in vendor.payments]
         }), 200
         
     except Exception as e:
@@ -96,21 +318,24 @@ def get_vendor_details(vendor_id):
 def toggle_vendor_status(vendor_id):
     """Activate or deactivate vendor account"""
     try:
-        if not check_admin():
+        if _current_admin_id() is None:
             return jsonify({'error': 'Access denied'}), 403
         
-        vendor = User.query.get(vendor_id)
+        vendor = db.session.get(User, vendor_id, with_for_update=True)
         if not vendor or vendor.role != 'vendor':
             return jsonify({'error': 'Vendor not found'}), 404
         
         vendor.is_active = not vendor.is_active
         vendor.updated_at = datetime.utcnow()
+        vendor_data = vendor.to_dict()
         db.session.commit()
+        invalidate_admin(vendor.id)
+        invalidate_user(vendor.id)
         
         status = 'activated' if vendor.is_active else 'deactivated'
         return jsonify({
             'message': f'Vendor {status} successfully',
-            'vendor': vendor.to_dict()
+            'vendor': vendor_data
         }), 200
         
     except Exception as e:
@@ -123,10 +348,7 @@ def toggle_vendor_status(vendor_id):
 def get_all_applications():
     """Get all vendor applications with optional filtering"""
     try:
-        if not check_admin():
-            return jsonify({'error': 'Access denied'}), 403
-        
-        current_admin_id = get_current_admin_id()
+        current_admin_id = _current_admin_id()
         if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
 
@@ -134,7 +356,16 @@ def get_all_applications():
         status = request.args.get('status')
         event_id = request.args.get('event_id', type=int)
         
-        query = VendorApplication.query.join(Event).filter(
+        # The ownership join already brings in the event, so fill the
+        # relationship from it rather than loading events again
+        load_options = [
+            contains_eager(VendorApplication.event),
+            selectinload(VendorApplication.vendor),
+            undefer_group('long_text')
+        ]
+        if current_app.debug:
+            load_options.append(raiseload('*', sql_only=True))
+        query = VendorApplication.query.join(Event).options(*load_options).filter(
             Event.created_by_admin_id == current_admin_id
         )
         
@@ -150,23 +381,54 @@ def get_all_applications():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/applications/export.csv', methods=['GET'])
+@jwt_required()
+def export_applications():
+    """Export applications as CSV, with the same filters as the listing"""
+    try:
+        current_admin_id = _current_admin_id()
+        if current_admin_id is None:
+            return jsonify({'error': 'Access denied'}), 403
+
+        status = request.args.get('status')
+        event_id = request.args.get('event_id', type=int)
+
+        stmt = _APPLICATION_EXPORT_ROWS
+        if status:
+            stmt = stmt.where(VendorApplication.status == status)
+        if event_id:
+            stmt = stmt.where(VendorApplication.event_id == event_id)
+
+        # Fetched in batches as the CSV is written, so memory stays flat
+        result = db.session.execute(
+            stmt, {'admin_id': current_admin_id},
+            execution_options={'yield_per': 500}
+        )
+        return _csv_response(result, 'applications.csv')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/applications/<int:application_id>/review', methods=['PUT'])
 @jwt_required()
 def review_application(application_id):
     """Approve or reject an application"""
     try:
-        if not check_admin():
+        current_admin_id = _current_admin_id()
+        if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
         
-        current_user_id = _current_user_id()
-        if current_user_id is None:
-            return jsonify({'error': 'Invalid token'}), 401
-        
-        application = VendorApplication.query.get(application_id)
+        # Check ownership and lock the application row in one query
+        application = db.session.execute(
+            select(VendorApplication).join(
+                Event, VendorApplication.event_id == Event.id
+            ).options(contains_eager(VendorApplication.event), undefer_group('long_text')).where(
+                VendorApplication.id == application_id,
+                Event.created_by_admin_id == current_admin_id
+            ).with_for_update(of=VendorApplication)
+        ).scalar_one_or_none()
         if not application:
-            return jsonify({'error': 'Application not found'}), 404
-        if not application.event or application.event.created_by_admin_id != current_user_id:
-            return jsonify({'error': 'Access denied for this event'}), 403
+            return _not_found_or_denied(VendorApplication, application_id, 'Application not found')
         
         data = request.get_json()
         
@@ -178,26 +440,21 @@ def review_application(application_id):
         application.status = data['status']
         application.admin_notes = data.get('admin_notes')
         application.reviewed_at = datetime.utcnow()
-        application.reviewed_by = current_user_id
+        application.reviewed_by = current_admin_id
         application.updated_at = datetime.utcnow()
         
         # If approved, create a payment record
         if data['status'] == 'approved' and application.event:
-            existing_payment = Payment.query.filter_by(application_id=application.id).first()
-            if not existing_payment:
-                payment = Payment(
-                    application_id=application.id,
-                    vendor_id=application.vendor_id,
-                    amount=application.event.vendor_fee,
-                    status='pending'
-                )
-                db.session.add(payment)
+            _create_pending_payments([application])
         
+        # Serialize inside the transaction: after commit every attribute is
+        # expired and to_dict() would reload the row (and its relationships)
+        application_data = application.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': f'Application {data["status"]} successfully',
-            'application': application.to_dict()
+            'application': application_data
         }), 200
         
     except Exception as e:
@@ -210,26 +467,21 @@ def review_application(application_id):
 def get_all_events():
     """Get all events"""
     try:
-        if not check_admin():
-            return jsonify({'error': 'Access denied'}), 403
-        
-        current_admin_id = get_current_admin_id()
+        current_admin_id = _current_admin_id()
         if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
 
-        events = Event.query.filter_by(
-            created_by_admin_id=current_admin_id
-        ).order_by(Event.event_date.desc()).all()
+        # Application counts are aggregated in a subquery, so the whole
+        # listing is a single statement regardless of the number of events.
+        results = db.session.execute(
+            _EVENTS_WITH_APPLICATION_COUNTS, {'admin_id': current_admin_id}
+        ).all()
         
-        # Add application counts
         events_data = []
-        for event in events:
+        for event, application_count, approved_vendors in results:
             event_dict = event.to_dict()
-            event_dict['application_count'] = VendorApplication.query.filter_by(event_id=event.id).count()
-            event_dict['approved_vendors'] = VendorApplication.query.filter_by(
-                event_id=event.id,
-                status='approved'
-            ).count()
+            event_dict['application_count'] = int(application_count)
+            event_dict['approved_vendors'] = int(approved_vendors)
             events_data.append(event_dict)
         
         return jsonify(events_data), 200
@@ -242,10 +494,7 @@ def get_all_events():
 def create_event():
     """Create a new event"""
     try:
-        if not check_admin():
-            return jsonify({'error': 'Access denied'}), 403
-        
-        current_admin_id = get_current_admin_id()
+        current_admin_id = _current_admin_id()
         if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
 
@@ -263,6 +512,11 @@ def create_event():
         except ValueError:
             return jsonify({'error': 'Invalid event_date format. Use ISO format'}), 400
         
+        try:
+            vendor_fee = _money(data.get('vendor_fee'))
+        except InvalidOperation:
+            return jsonify({'error': 'Invalid vendor_fee'}), 400
+        
         # Create event
         event = Event(
             name=data['name'],
@@ -271,7 +525,7 @@ def create_event():
             location=data.get('location'),
             venue=data.get('venue'),
             expected_attendees=data.get('expected_attendees'),
-            vendor_fee=data.get('vendor_fee', 0.0),
+            vendor_fee=vendor_fee,
             status=data.get('status', 'upcoming'),
             created_by_admin_id=current_admin_id,
             default_currency=str(data.get('default_currency', 'USD')).upper(),
@@ -285,16 +539,18 @@ def create_event():
             card_instructions=data.get('card_instructions')
         )
 
-        allowed_currencies = [c.strip() for c in event.currency_options.split(',') if c.strip()]
+        allowed_currencies = _parse_currency_set(event.currency_options)
         if event.default_currency not in allowed_currencies:
             return jsonify({'error': 'default_currency must be included in currency_options'}), 400
         
         db.session.add(event)
+        db.session.flush()
+        event_data = event.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Event created successfully',
-            'event': event.to_dict()
+            'event': event_data
         }), 201
         
     except Exception as e:
@@ -306,15 +562,20 @@ def create_event():
 def update_event(event_id):
     """Update an event"""
     try:
-        if not check_admin():
+        current_admin_id = _current_admin_id()
+        if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
         
-        event = Event.query.get(event_id)
+        event = db.session.execute(
+            select(Event).where(
+                Event.id == event_id,
+                Event.created_by_admin_id == current_admin_id
+            ).options(
+                undefer_group('long_text'), joinedload(Event.created_by_admin)
+            ).with_for_update(of=Event)
+        ).scalar_one_or_none()
         if not event:
-            return jsonify({'error': 'Event not found'}), 404
-        current_admin_id = get_current_admin_id()
-        if current_admin_id is None or event.created_by_admin_id != current_admin_id:
-            return jsonify({'error': 'Access denied for this event'}), 403
+            return _not_found_or_denied(Event, event_id, 'Event not found')
         
         data = request.get_json()
         
@@ -335,7 +596,10 @@ def update_event(event_id):
         if 'expected_attendees' in data:
             event.expected_attendees = data['expected_attendees']
         if 'vendor_fee' in data:
-            event.vendor_fee = data['vendor_fee']
+            try:
+                event.vendor_fee = _money(data['vendor_fee'])
+            except InvalidOperation:
+                return jsonify({'error': 'Invalid vendor_fee'}), 400
         if 'status' in data:
             event.status = data['status']
         if 'default_currency' in data:
@@ -354,18 +618,19 @@ def update_event(event_id):
         if 'card_instructions' in data:
             event.card_instructions = data['card_instructions']
 
-        allowed_currencies = [c.strip() for c in (event.currency_options or '').split(',') if c.strip()]
+        allowed_currencies = _parse_currency_set(event.currency_options)
         if not allowed_currencies:
             return jsonify({'error': 'currency_options cannot be empty'}), 400
         if (event.default_currency or '').upper() not in allowed_currencies:
             return jsonify({'error': 'default_currency must be included in currency_options'}), 400
         
         event.updated_at = datetime.utcnow()
+        event_data = event.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Event updated successfully',
-            'event': event.to_dict()
+            'event': event_data
         }), 200
         
     except Exception as e:
@@ -377,21 +642,26 @@ def update_event(event_id):
 def delete_event(event_id):
     """Delete an event"""
     try:
-        if not check_admin():
+        current_admin_id = _current_admin_id()
+        if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
         
-        event = Event.query.get(event_id)
+        event = db.session.execute(
+            select(Event).where(
+                Event.id == event_id,
+                Event.created_by_admin_id == current_admin_id
+            ).with_for_update(of=Event)
+        ).scalar_one_or_none()
         if not event:
-            return jsonify({'error': 'Event not found'}), 404
-        current_admin_id = get_current_admin_id()
-        if current_admin_id is None or event.created_by_admin_id != current_admin_id:
-            return jsonify({'error': 'Access denied for this event'}), 403
+            return _not_found_or_denied(Event, event_id, 'Event not found')
         
         # Check if there are any applications
-        app_count = VendorApplication.query.filter_by(event_id=event_id).count()
-        if app_count > 0:
+        has_applications = db.session.query(
+            exists().where(VendorApplication.event_id == event_id)
+        ).scalar()
+        if has_applications:
             return jsonify({
-                'error': f'Cannot delete event with {app_count} applications. Cancel event instead.'
+                'error': 'Cannot delete event with existing applications. Cancel event instead.'
             }), 400
         
         db.session.delete(event)
@@ -409,37 +679,64 @@ def delete_event(event_id):
 def get_all_payments():
     """Get all payments"""
     try:
-        if not check_admin():
-            return jsonify({'error': 'Access denied'}), 403
-        
-        current_admin_id = get_current_admin_id()
+        current_admin_id = _current_admin_id()
         if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
 
-        payments = Payment.query.join(VendorApplication).join(Event).filter(
-            Event.created_by_admin_id == current_admin_id
-        ).order_by(Payment.created_at.desc()).all()
-        return jsonify([payment.to_dict() for payment in payments]), 200
+        # Select just the serialized columns and stream them out in batches
+        # instead of hydrating every Payment (and its vendor) up front
+        rows = db.session.execute(
+            _PAYMENT_ROWS, {'admin_id': current_admin_id},
+            execution_options={'yield_per': 500}
+        )
+
+        return Response(
+            stream_with_context(_stream_json_array(_payment_row_to_dict(row) for row in rows)),
+            mimetype='application/json'
+        ), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@admin_bp.route('/payments/export.csv', methods=['GET'])
+@jwt_required()
+def export_payments():
+    """Export payments as CSV"""
+    try:
+        current_admin_id = _current_admin_id()
+        if current_admin_id is None:
+            return jsonify({'error': 'Access denied'}), 403
+
+        result = db.session.execute(
+            _PAYMENT_ROWS, {'admin_id': current_admin_id},
+            execution_options={'yield_per': 500}
+        )
+        return _csv_response(result, 'payments.csv')
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @admin_bp.route('/payments/<int:payment_id>/update-status', methods=['PUT'])
 @jwt_required()
 def update_payment_status(payment_id):
     """Update payment status"""
     try:
-        if not check_admin():
+        current_admin_id = _current_admin_id()
+        if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
         
-        payment = Payment.query.get(payment_id)
+        payment = db.session.execute(
+            select(Payment).join(
+                VendorApplication, Payment.application_id == VendorApplication.id
+            ).join(
+                Event, VendorApplication.event_id == Event.id
+            ).where(
+                Payment.id == payment_id,
+                Event.created_by_admin_id == current_admin_id
+            ).options(undefer_group('long_text')).with_for_update(of=Payment)
+        ).scalar_one_or_none()
         if not payment:
-            return jsonify({'error': 'Payment not found'}), 404
-        current_admin_id = get_current_admin_id()
-        if current_admin_id is None:
-            return jsonify({'error': 'Access denied'}), 403
-        if not payment.application or not payment.application.event or payment.application.event.created_by_admin_id != current_admin_id:
-            return jsonify({'error': 'Access denied for this event'}), 403
+            return _not_found_or_denied(Payment, payment_id, 'Payment not found')
         
         data = request.get_json()
         
@@ -461,11 +758,12 @@ def update_payment_status(payment_id):
             payment.notes = data['notes']
         
         payment.updated_at = datetime.utcnow()
+        payment_data = payment.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Payment status updated successfully',
-            'payment': payment.to_dict()
+            'payment': payment_data
         }), 200
         
     except Exception as e:
@@ -478,74 +776,73 @@ def update_payment_status(payment_id):
 def get_admin_dashboard_stats():
     """Get comprehensive dashboard statistics"""
     try:
-        if not check_admin():
-            return jsonify({'error': 'Access denied'}), 403
-        
-        current_admin_id = get_current_admin_id()
+        current_admin_id = _current_admin_id()
         if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
 
-        owned_events_query = Event.query.filter_by(created_by_admin_id=current_admin_id)
-        owned_event_ids = [e.id for e in owned_events_query.all()]
-
-        owned_app_query = VendorApplication.query.filter(VendorApplication.event_id.in_(owned_event_ids)) if owned_event_ids else VendorApplication.query.filter(False)
-        owned_apps = owned_app_query.all()
-        owned_vendor_ids = {a.vendor_id for a in owned_apps}
+        now = datetime.utcnow()
+        week_ago = now - timedelta(days=7)
 
-        # Vendor stats
-        total_vendors = User.query.filter(User.role == 'vendor', User.id.in_(owned_vendor_ids)).count() if owned_vendor_ids else 0
-        active_vendors = User.query.filter(User.role == 'vendor', User.is_active == True, User.id.in_(owned_vendor_ids)).count() if owned_vendor_ids else 0
-        
-        # Application stats
-        total_applications = owned_app_query.count()
-        pending_applications = owned_app_query.filter_by(status='pending').count()
-        approved_applications = owned_app_query.filter_by(status='approved').count()
-        rejected_applications = owned_app_query.filter_by(status='rejected').count()
-        
         # Event stats
-        total_events = owned_events_query.count()
-        upcoming_events = owned_events_query.filter(
-            Event.status == 'upcoming',
-            Event.event_date > datetime.utcnow()
-        ).count()
-        ongoing_events = owned_events_query.filter_by(status='ongoing').count()
+        total_events, upcoming_events, ongoing_events = db.session.query(
+            func.count(Event.id),
+            func.sum(case((and_(Event.status == 'upcoming', Event.event_date > now), 1), else_=0)),
+            func.sum(case((Event.status == 'ongoing', 1), else_=0))
+        ).filter(Event.created_by_admin_id == current_admin_id).one()
+
+        # Vendors who applied to one of the admin's events, counted in scalar
+        # subqueries so users are never joined to (and fanned out by) applications
+        owned_vendor_ids = select(VendorApplication.vendor_id).join(
+            Event, VendorApplication.event_id == Event.id
+        ).where(Event.created_by_admin_id == current_admin_id)
+
+        def count_vendors(*conditions):
+            return select(func.count(User.id)).where(
+                User.role == 'vendor', User.id.in_(owned_vendor_ids), *conditions
+            ).correlate(None).scalar_subquery()
+
+        # Application and vendor stats
+        (total_applications, pending_applications, approved_applications,
+         rejected_applications, new_applications_week,
+         total_vendors, active_vendors, new_vendors_week) = db.session.query(
+            func.count(VendorApplication.id),
+            func.sum(case((VendorApplication.status == 'pending', 1), else_=0)),
+            func.sum(case((VendorApplication.status == 'approved', 1), else_=0)),
+            func.sum(case((VendorApplication.status == 'rejected', 1), else_=0)),
+            func.sum(case((VendorApplication.applied_at >= week_ago, 1), else_=0)),
+            count_vendors(),
+            count_vendors(User.is_active == True),
+            count_vendors(User.created_at >= week_ago)
+        ).join(Event, VendorApplication.event_id == Event.id).filter(
+            Event.created_by_admin_id == current_admin_id
+        ).one()
         
         # Payment stats
-        all_payments = Payment.query.join(VendorApplication).join(Event).filter(
-            Event.created_by_admin_id == current_admin_id
-        ).all()
-        total_revenue = sum(p.amount for p in all_payments if p.status == 'completed')
-        pending_revenue = sum(p.amount for p in all_payments if p.status == 'pending')
-        
-        # Recent activity (last 7 days)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        new_vendors_week = User.query.filter(
-            User.role == 'vendor',
-            User.created_at >= week_ago,
-            User.id.in_(owned_vendor_ids)
-        ).count() if owned_vendor_ids else 0
-        new_applications_week = owned_app_query.filter(
-            VendorApplication.applied_at >= week_ago
-        ).count()
+        total_revenue, pending_revenue = db.session.query(
+            func.coalesce(func.sum(case((Payment.status == 'completed', Payment.amount), else_=0)), 0),
+            func.coalesce(func.sum(case((Payment.status == 'pending', Payment.amount), else_=0)), 0)
+        ).join(VendorApplication, Payment.application_id == VendorApplication.id).join(
+            Event, VendorApplication.event_id == Event.id
+        ).filter(Event.created_by_admin_id == current_admin_id).one()
         
         return jsonify({
             'vendors': {
                 'total': total_vendors,
-                'active': active_vendors,
-                'inactive': total_vendors - active_vendors,
-                'new_this_week': new_vendors_week
+                'active': int(active_vendors or 0),
+                'inactive': total_vendors - int(active_vendors or 0),
+                'new_this_week': int(new_vendors_week or 0)
             },
             'applications': {
                 'total': total_applications,
-                'pending': pending_applications,
-                'approved': approved_applications,
-                'rejected': rejected_applications,
-                'new_this_week': new_applications_week
+                'pending': int(pending_applications or 0),
+                'approved': int(approved_applications or 0),
+                'rejected': int(rejected_applications or 0),
+                'new_this_week': int(new_applications_week or 0)
             },
             'events': {
                 'total': total_events,
-                'upcoming': upcoming_events,
-                'ongoing': ongoing_events
+                'upcoming': int(upcoming_events or 0),
+                'ongoing': int(ongoing_events or 0)
             },
             'revenue': {
                 'total': total_revenue,
@@ -561,19 +858,13 @@ def get_admin_dashboard_stats():
 def get_applications_by_status():
     """Get application count by status for charts"""
     try:
-        if not check_admin():
-            return jsonify({'error': 'Access denied'}), 403
-        
-        current_admin_id = get_current_admin_id()
+        current_admin_id = _current_admin_id()
         if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
 
-        results = db.session.query(
-            VendorApplication.status,
-            func.count(VendorApplication.id)
-        ).join(Event, VendorApplication.event_id == Event.id).filter(
-            Event.created_by_admin_id == current_admin_id
-        ).group_by(VendorApplication.status).all()
+        results = db.session.execute(
+            _APPLICATION_STATUS_COUNTS, {'admin_id': current_admin_id}
+        ).all()
         
         data = [{'status': status, 'count': count} for status, count in results]
         return jsonify(data), 200
@@ -586,10 +877,7 @@ def get_applications_by_status():
 def get_applications_over_time():
     """Get applications over time (last 6 months)"""
     try:
-        if not check_admin():
-            return jsonify({'error': 'Access denied'}), 403
-        
-        current_admin_id = get_current_admin_id()
+        current_admin_id = _current_admin_id()
         if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
 
@@ -614,10 +902,7 @@ def get_applications_over_time():
 def get_revenue_by_month():
     """Get revenue by month"""
     try:
-        if not check_admin():
-            return jsonify({'error': 'Access denied'}), 403
-        
-        current_admin_id = get_current_admin_id()
+        current_admin_id = _current_admin_id()
         if current_admin_id is None:
             return jsonify({'error': 'Access denied'}), 403
 
@@ -640,3 +925,36 @@ def get_revenue_by_month():
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/analytics/dashboard', methods=['GET'])
+@jwt_required()
+def get_analytics_dashboard():
+    """Get all dashboard chart data (status counts, applications and revenue by month) in one query"""
+    try:
+        current_admin_id = _current_admin_id()
+        if current_admin_id is None:
+            return jsonify({'error': 'Access denied'}), 403
+
+        six_months_ago = datetime.utcnow() - timedelta(days=180)
+
+        results = db.session.execute(_ANALYTICS_DASHBOARD, {
+            'admin_id': current_admin_id,
+            'since': six_months_ago
+        }).all()
+
+        data = {
+            'applications_by_status': [],
+            'applications_over_time': [],
+            'revenue_by_month': []
+        }
+        for kind, key, value in results:
+            if kind == 'status':
+                data['applications_by_status'].append({'status': key, 'count': int(value)})
+            elif kind == 'applications':
+                data['applications_over_time'].append({'month': key, 'count': int(value)})
+            else:
+                data['revenue_by_month'].append({'month': key, 'revenue': float(value or 0)})
+        return jsonify(data), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
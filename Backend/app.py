@@ -1,14 +1,72 @@
-from flask import Flask, jsonify, send_file
+from flask import Flask, Response, current_app, jsonify, send_from_directory
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import config
 from models import db, User, Event, VendorApplication, Payment
+from json_provider import init_json
+from public_events import get_public_events_body, PUBLIC_EVENTS_TTL
 from auth_routes import auth_bp
 from vendor_routes import vendor_bp
 from admin_routes import admin_bp
 from datetime import datetime
-from sqlalchemy import inspect, text
+from functools import lru_cache
+from werkzeug.security import generate_password_hash
+from sqlalchemy import Column, MetaData, String, Table, delete, event, exists, func, insert, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+from flask_sqlalchemy.record_queries import get_recorded_queries
+import hashlib
 import os
+import sqlite3
+import tempfile
+import time
+
+
+# Bodies for the fixed error responses, which bots and expired sessions hit
+# far more often than real endpoints; serialized once instead of per request
+_NOT_FOUND_BODY = b'{"error":"Resource not found"}'
+_INTERNAL_ERROR_BODY = b'{"error":"Internal server error"}'
+_MISSING_TOKEN_BODY = b'{"error":"Missing authorization token"}'
+_INVALID_TOKEN_BODY = b'{"error":"Invalid token"}'
+_EXPIRED_TOKEN_BODY = b'{"error":"Token has expired"}'
+
+
+def _error_response(body, status):
+    return Response(body, status=status, mimetype='application/json')
+
+
+@lru_cache(maxsize=1)
+def _health_body(second):
+    """Health check body, rebuilt at most once per second for polling load balancers"""
+    return current_app.json.dumps({
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection; other databases are left alone."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
+
+# Columns added to events after the first release, with their SQLite DDL
+_EVENT_COLUMN_MIGRATIONS = (
+    ('created_by_admin_id', 'INTEGER'),
+    ('default_currency', "VARCHAR(10) DEFAULT 'USD'"),
+    ('currency_options', "VARCHAR(120) DEFAULT 'USD'"),
+    ('mpesa_number', 'VARCHAR(40)'),
+    ('paypal_account', 'VARCHAR(120)'),
+    ('zelle_account', 'VARCHAR(120)'),
+    ('card_instructions', 'VARCHAR(255)'),
+)
 
 
 def migrate_sqlite_schema(app):
@@ -17,41 +75,33 @@ def migrate_sqlite_schema(app):
     if not str(database_uri).startswith('sqlite'):
         return
 
-    with app.app_context():
-        inspector = inspect(db.engine)
-        table_names = inspector.get_table_names()
-        if 'events' not in table_names:
+    with app.app_context(), db.engine.begin() as conn:
+        existing_columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(events)")}
+        if not existing_columns:
             return
+        payment_columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(payments)")}
 
-        existing_columns = {column['name'] for column in inspector.get_columns('events')}
-        alter_statements = []
-
-        if 'created_by_admin_id' not in existing_columns:
-            alter_statements.append("ALTER TABLE events ADD COLUMN created_by_admin_id INTEGER")
-        if 'default_currency' not in existing_columns:
-            alter_statements.append("ALTER TABLE events ADD COLUMN default_currency VARCHAR(10) DEFAULT 'USD'")
-        if 'currency_options' not in existing_columns:
-            alter_statements.append("ALTER TABLE events ADD COLUMN currency_options VARCHAR(120) DEFAULT 'USD'")
-        if 'mpesa_number' not in existing_columns:
-            alter_statements.append("ALTER TABLE events ADD COLUMN mpesa_number VARCHAR(40)")
-        if 'paypal_account' not in existing_columns:
-            alter_statements.append("ALTER TABLE events ADD COLUMN paypal_account VARCHAR(120)")
-        if 'zelle_account' not in existing_columns:
-            alter_statements.append("ALTER TABLE events ADD COLUMN zelle_account VARCHAR(120)")
-        if 'card_instructions' not in existing_columns:
-            alter_statements.append("ALTER TABLE events ADD COLUMN card_instructions VARCHAR(255)")
+        alter_statements = [
+            f"ALTER TABLE events ADD COLUMN {name} {definition}"
+            for name, definition in _EVENT_COLUMN_MIGRATIONS
+            if name not in existing_columns
+        ]
 
         if not alter_statements:
             return
 
+        # pysqlite doesn't open a transaction before DDL, so each ALTER would
+        # otherwise commit (and fsync) on its own
+        conn.exec_driver_sql("BEGIN")
+
         for statement in alter_statements:
-            db.session.execute(text(statement))
+            conn.execute(text(statement))
 
-        admin_id = db.session.execute(
+        admin_id = conn.execute(
             text("SELECT id FROM users WHERE role = 'admin' ORDER BY id LIMIT 1")
         ).scalar()
         if admin_id is not None and 'created_by_admin_id' not in existing_columns:
-            db.session.execute(
+            conn.execute(
                 text(
                     "UPDATE events "
                     "SET created_by_admin_id = :admin_id "
@@ -61,15 +111,110 @@ def migrate_sqlite_schema(app):
             )
 
         # Payments table migrations for older SQLite schemas.
-        if 'payments' in table_names:
-            payment_columns = {column['name'] for column in inspector.get_columns('payments')}
+        if payment_columns:
             if 'currency' not in payment_columns:
-                db.session.execute(text("ALTER TABLE payments ADD COLUMN currency VARCHAR(10) DEFAULT 'USD'"))
-                db.session.execute(text("UPDATE payments SET currency = 'USD' WHERE currency IS NULL OR currency = ''"))
+                conn.execute(text("ALTER TABLE payments ADD COLUMN currency VARCHAR(10) DEFAULT 'USD'"))
+                conn.execute(text("UPDATE payments SET currency = 'USD' WHERE currency IS NULL OR currency = ''"))
             if 'pay_to' not in payment_columns:
-                db.session.execute(text("ALTER TABLE payments ADD COLUMN pay_to VARCHAR(255)"))
+                conn.execute(text("ALTER TABLE payments ADD COLUMN pay_to VARCHAR(255)"))
+
+def _existing_indexes(conn):
+    """Names of the indexes on the database and, per table, the column lists already indexed"""
+    if conn.dialect.name == 'sqlite':
+        # The inspector skips expression indexes on SQLite, so ask the catalog;
+        # every SQLite database was built from the models, so names suffice
+        return {name for name, in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}, {}
+    inspector = inspect(conn)
+    names, covered = set(), {}
+    for (_, table), indexes in inspector.get_multi_indexes().items():
+        for index in indexes:
+            names.add(index['name'])
+            covered.setdefault(table, set()).add((tuple(index['column_names']), index['unique']))
+    for (_, table), constraints in inspector.get_multi_unique_constraints().items():
+        for constraint in constraints:
+            covered.setdefault(table, set()).add((tuple(constraint['column_names']), True))
+    return names, covered
+
+def _already_indexed(index, names, covered):
+    if index.name in names:
+        return True
+    # An index under another name (mysql_schema.sql's inline UNIQUE on
+    # users.email is called `email`) already covers plain column indexes
+    columns = tuple(column.name for column in index.columns)
+    if not columns or len(columns) != len(index.expressions) or any(key.endswith('_where') for key in index.kwargs):
+        return False
+    return any(
+        existing == columns and (unique or not index.unique)
+        for existing, unique in covered.get(index.table.name, ())
+    )
+
+def dedupe_payments(conn):
+    """Drop the duplicate pending payments uq_payments_application_id would reject
+
+    Approving an application twice used to record a second pending payment;
+    each application keeps its completed payment, or else its oldest one.
+    """
+    duplicated = select(Payment.application_id).group_by(Payment.application_id).having(func.count() > 1)
+    rows = conn.execute(
+        select(Payment.id, Payment.application_id, Payment.status)
+        .where(Payment.application_id.in_(duplicated))
+        .order_by(Payment.application_id, (Payment.status == 'completed').desc(), Payment.id)
+    ).all()
+    kept, stale, conflicting = set(), [], set()
+    for payment_id, application_id, status in rows:
+        if application_id not in kept:
+            kept.add(application_id)
+        elif status == 'pending':
+            stale.append(payment_id)
+        else:
+            conflicting.add(application_id)
+    if conflicting:
+        raise RuntimeError(
+            'Cannot create uq_payments_application_id: application ids %s have more than one '
+            'settled payment. Reconcile them by hand so each keeps a single payment row, then restart.'
+            % ', '.join(map(str, sorted(conflicting)))
+        )
+    if stale:
+        conn.execute(delete(Payment).where(Payment.id.in_(stale)))
+
+def migrate_indexes(app):
+    """Create indexes declared on the models that existing databases are missing."""
+    with app.app_context(), db.engine.begin() as conn:
+        names, covered = _existing_indexes(conn)
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if _already_indexed(index, names, covered):
+                    continue
+                if index.name == 'uq_payments_application_id':
+                    dedupe_payments(conn)
+                index.create(conn)
+
+
+# Kept out of db.metadata so create_all and migrate_indexes never see it
+_schema_fingerprint = Table(
+    'schema_fingerprint', MetaData(),
+    Column('fingerprint', String(64), nullable=False)
+)
 
-        db.session.commit()
+
+def schema_fingerprint(engine):
+    """sha256 of the DDL the models compile to on this database's dialect"""
+    digest = hashlib.sha256()
+    for table in db.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode())
+    return digest.hexdigest()
+
+
+def _stored_schema_fingerprint(conn):
+    _schema_fingerprint.create(conn, checkfirst=True)
+    return conn.scalar(select(_schema_fingerprint.c.fingerprint))
+
+
+def _store_schema_fingerprint(conn, fingerprint):
+    conn.execute(delete(_schema_fingerprint))
+    conn.execute(insert(_schema_fingerprint), {'fingerprint': fingerprint})
 
 def create_app(config_name='development'):
     """Application factory pattern"""
@@ -77,6 +222,7 @@ def create_app(config_name='development'):
     
     # Load configuration
     app.config.from_object(config[config_name])
+    init_json(app)
     
     # Initialize extensions
     CORS(app, resources={r"/api/*": {"origins": "*"}})
@@ -88,84 +234,114 @@ def create_app(config_name='development'):
     app.register_blueprint(vendor_bp, url_prefix='/api/vendor')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create tables, apply schema migrations and seed sample data."""
+        init_db(app)
+    
     # Health check endpoint
+    # Resolved once at startup; in production nginx can serve this file directly
+    frontend_index = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        'Frontend',
+        'index.html'
+    )
+    app.config.setdefault('FRONTEND_INDEX', frontend_index if os.path.exists(frontend_index) else None)
+
     @app.route('/', methods=['GET'])
     def landing_page():
-        frontend_index = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            'Frontend',
-            'index.html'
-        )
-        if os.path.exists(frontend_index):
-            return send_file(frontend_index)
+        frontend_index = app.config['FRONTEND_INDEX']
+        if frontend_index:
+            return send_from_directory(
+                os.path.dirname(frontend_index), os.path.basename(frontend_index), max_age=300
+            )
         return jsonify({'error': 'Landing page not found'}), 404
 
     @app.route('/api/health', methods=['GET'])
     def health_check():
-        return jsonify({
-            'status': 'healthy',
-            'timestamp': datetime.utcnow().isoformat()
-        }), 200
+        return Response(_health_body(int(time.monotonic())), mimetype='application/json'), 200
 
     @app.route('/api/events', methods=['GET'])
     def public_events():
         """Public list of available events"""
         try:
-            events = Event.query.filter(
-                Event.status.in_(['upcoming', 'ongoing'])
-            ).order_by(Event.event_date.asc()).all()
-            return jsonify([event.to_dict() for event in events]), 200
+            response = Response(get_public_events_body(), mimetype='application/json')
+            response.headers['Cache-Control'] = f'public, max-age={PUBLIC_EVENTS_TTL}'
+            return response, 200
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
+    if app.config.get('SQLALCHEMY_RECORD_QUERIES'):
+        @app.after_request
+        def add_query_count(response):
+            # Makes N+1 regressions visible in the browser's network tab
+            response.headers['X-Query-Count'] = str(len(get_recorded_queries()))
+            return response
+
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
-        return jsonify({'error': 'Resource not found'}), 404
+        return _error_response(_NOT_FOUND_BODY, 404)
     
     @app.errorhandler(500)
     def internal_error(error):
         db.session.rollback()
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_INTERNAL_ERROR_BODY, 500)
     
     # JWT error handlers
     @jwt.unauthorized_loader
     def unauthorized_callback(callback):
-        return jsonify({'error': 'Missing authorization token'}), 401
+        return _error_response(_MISSING_TOKEN_BODY, 401)
     
     @jwt.invalid_token_loader
     def invalid_token_callback(callback):
-        return jsonify({'error': 'Invalid token'}), 401
+        return _error_response(_INVALID_TOKEN_BODY, 401)
     
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
-        return jsonify({'error': 'Token has expired'}), 401
+        return _error_response(_EXPIRED_TOKEN_BODY, 401)
     
     return app
 
 def init_db(app):
     """Initialize database with sample data"""
     with app.app_context():
-        # Create all tables
-        db.create_all()
-        migrate_sqlite_schema(app)
+        # Schema work only runs when the models changed since the last boot
+        fingerprint = schema_fingerprint(db.engine)
+        with db.engine.begin() as conn:
+            schema_is_current = _stored_schema_fingerprint(conn) == fingerprint
+        if not schema_is_current:
+            db.create_all()
+            migrate_sqlite_schema(app)
+            migrate_indexes(app)
+            with db.engine.begin() as conn:
+                _store_schema_fingerprint(conn, fingerprint)
         
         # Check if data already exists
-        if User.query.first() is not None:
+        if db.session.scalar(select(exists().select_from(User))):
+            if db.engine.dialect.name == 'sqlite':
+                # Refresh planner statistics only where they have gone stale
+                db.session.execute(text("PRAGMA optimize"))
             print("Database already initialized")
             return
         
         print("Initializing database with sample data...")
         
+        # The sample accounts share passwords, so hash each distinct one once
+        @lru_cache(maxsize=None)
+        def hash_password(password):
+            return generate_password_hash(
+                password, method=app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+            )
+        
         # Create admin user
-        admin = User(
-            email='admin@eventflow.com',
-            full_name='System Administrator',
-            role='admin',
-            phone='+1234567890'
-        )
-        admin.set_password('admin123')
-        db.session.add(admin)
+        admin = {
+            'email': 'admin@eventflow.com',
+            'full_name': 'System Administrator',
+            'role': 'admin',
+            'phone': '+1234567890',
+            'password_hash': hash_password('admin123')
+        }
         
         # Create sample vendors
         vendors = [
@@ -195,15 +371,19 @@ def init_db(app):
             }
         ]
         
-        vendor_objects = []
-        for v_data in vendors:
-            password = v_data.pop('password')
-            vendor = User(**v_data, role='vendor')
-            vendor.set_password(password)
-            vendor_objects.append(vendor)
-            db.session.add(vendor)
+        vendor_rows = [
+            {
+                **{key: value for key, value in v_data.items() if key != 'password'},
+                'role': 'vendor',
+                'password_hash': hash_password(v_data['password'])
+            }
+            for v_data in vendors
+        ]
         
-        db.session.commit()
+        # Everything below is seeded in one transaction from plain dicts, so no
+        # ORM objects are built. return_defaults writes each generated id back
+        # into its dict for the next phase to use as a foreign key
+        db.session.bulk_insert_mappings(User, [admin] + vendor_rows, return_defaults=True)
         
         # Create sample events
         events = [
@@ -249,67 +429,57 @@ def init_db(app):
             }
         ]
         
-        event_objects = []
         for e_data in events:
-            e_data['created_by_admin_id'] = admin.id
-            event = Event(**e_data)
-            event_objects.append(event)
-            db.session.add(event)
+            e_data['created_by_admin_id'] = admin['id']
         
-        db.session.commit()
+        db.session.bulk_insert_mappings(Event, events, return_defaults=True)
         
         # Create sample applications
         applications = [
             {
-                'vendor_id': vendor_objects[0].id,
-                'event_id': event_objects[0].id,
+                'vendor_id': vendor_rows[0]['id'],
+                'event_id': events[0]['id'],
                 'product_service': 'Gourmet burgers and craft beverages',
                 'booth_requirements': 'Need 10x10 booth with electricity and water access',
                 'status': 'approved',
                 'reviewed_at': datetime.utcnow(),
-                'reviewed_by': admin.id,
+                'reviewed_by': admin['id'],
                 'admin_notes': 'Excellent vendor with great reviews'
             },
             {
-                'vendor_id': vendor_objects[1].id,
-                'event_id': event_objects[2].id,
+                'vendor_id': vendor_rows[1]['id'],
+                'event_id': events[2]['id'],
                 'product_service': 'Handmade jewelry and pottery',
                 'booth_requirements': 'Standard 8x8 booth',
                 'status': 'pending'
             },
             {
-                'vendor_id': vendor_objects[2].id,
-                'event_id': event_objects[1].id,
+                'vendor_id': vendor_rows[2]['id'],
+                'event_id': events[1]['id'],
                 'product_service': 'Latest smartphones and accessories',
                 'booth_requirements': 'Large booth with display cases and electricity',
                 'status': 'approved',
                 'reviewed_at': datetime.utcnow(),
-                'reviewed_by': admin.id
+                'reviewed_by': admin['id']
             },
             {
-                'vendor_id': vendor_objects[0].id,
-                'event_id': event_objects[3].id,
+                'vendor_id': vendor_rows[0]['id'],
+                'event_id': events[3]['id'],
                 'product_service': 'Food and beverages',
                 'booth_requirements': 'Standard booth',
                 'status': 'approved',
                 'reviewed_at': datetime(2025, 11, 1, 10, 0),
-                'reviewed_by': admin.id
+                'reviewed_by': admin['id']
             }
         ]
         
-        application_objects = []
-        for a_data in applications:
-            application = VendorApplication(**a_data)
-            application_objects.append(application)
-            db.session.add(application)
-        
-        db.session.commit()
+        db.session.bulk_insert_mappings(VendorApplication, applications, return_defaults=True)
         
         # Create sample payments
         payments = [
             {
-                'application_id': application_objects[0].id,
-                'vendor_id': vendor_objects[0].id,
+                'application_id': applications[0]['id'],
+                'vendor_id': vendor_rows[0]['id'],
                 'amount': 500.0,
                 'payment_method': 'credit_card',
                 'transaction_id': 'TXN001234567',
@@ -317,15 +487,15 @@ def init_db(app):
                 'payment_date': datetime(2026, 2, 1, 14, 30)
             },
             {
-                'application_id': application_objects[2].id,
-                'vendor_id': vendor_objects[2].id,
+                'application_id': applications[2]['id'],
+                'vendor_id': vendor_rows[2]['id'],
                 'amount': 1000.0,
                 'payment_method': 'bank_transfer',
                 'status': 'pending'
             },
             {
-                'application_id': application_objects[3].id,
-                'vendor_id': vendor_objects[0].id,
+                'application_id': applications[3]['id'],
+                'vendor_id': vendor_rows[0]['id'],
                 'amount': 750.0,
                 'payment_method': 'credit_card',
                 'transaction_id': 'TXN001234568',
@@ -334,11 +504,13 @@ def init_db(app):
             }
         ]
         
-        for p_data in payments:
-            payment = Payment(**p_data)
-            db.session.add(payment)
-        
+        # Nothing reads the payments back, so they go in as one executemany
+        db.session.bulk_insert_mappings(Payment, payments)
         db.session.commit()
+        if db.engine.dialect.name == 'sqlite':
+            # Give the query planner statistics for the new indexes
+            db.session.execute(text("ANALYZE"))
+            db.session.commit()
         
         print("Database initialized successfully!")
         print("\nLogin credentials:")
@@ -347,6 +519,23 @@ def init_db(app):
         print("Vendor 2: vendor2@example.com / vendor123")
         print("Vendor 3: vendor3@example.com / vendor123")
 
+def init_db_locked(app):
+    """Run init_db under an exclusive file lock, so workers booting together take turns"""
+    try:
+        import fcntl
+    except ImportError:  # no flock on Windows; workers there run init_db unguarded
+        init_db(app)
+        return
+    lock_path = os.environ.get('EVENTFLOW_INIT_LOCK') or os.path.join(
+        tempfile.gettempdir(), 'eventflow-init-db.lock'
+    )
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            init_db(app)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
 if __name__ == '__main__':
     config_name = os.environ.get('APP_CONFIG', 'development')
     app = create_app(config_name)
@@ -358,4 +547,5 @@ if __name__ == '__main__':
     print("\nStarting EventFlow API server...")
     print(f"Using config: {config_name}")
     print("API available at: http://localhost:5000/api")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
+    app.run(debug=app.config.get('DEBUG', False), host='0.0.0.0', port=5000, threaded=True)
@@ -1,10 +1,34 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from models import db, User
+from models import db, User, CaseFolded
+from cache import TTLCache
 from datetime import datetime
+from functools import lru_cache
+from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import select, bindparam, exists
 
 auth_bp = Blueprint('auth', __name__)
 
+# user_id -> serialized /me payload, so polling clients don't hit the database
+_user_payload_cache = TTLCache(maxsize=10000, ttl=60)
+
+# Built once so login/register reuse the cached compiled statement
+# Emails are stored lowercase; lower() on the column (backed by
+# ix_users_email_lower) still matches accounts created before that
+_USER_BY_EMAIL = select(User).where(CaseFolded(User.email) == bindparam('email'))
+_EMAIL_TAKEN = select(exists().where(CaseFolded(User.email) == bindparam('email')))
+
+# Emails that recently matched no account. Repeated misses (enumeration,
+# credential stuffing) are answered from memory instead of the database.
+# Kept short since other workers won't see a registration clear it.
+_unknown_email_cache = TTLCache(maxsize=10000, ttl=10)
+
+
+@lru_cache(maxsize=4)
+def _dummy_password_hash(method):
+    """A throwaway hash so failed lookups cost as much as a wrong password"""
+    return generate_password_hash('not-a-real-password', method=method)
+
 
 def _current_user_id():
     try:
@@ -13,6 +37,15 @@ def _current_user_id():
         return None
 
 
+def _normalize_email(email):
+    return str(email).strip().lower()
+
+
+def invalidate_user(user_id):
+    """Forget the cached profile of a user whose account was changed"""
+    _user_payload_cache.pop(user_id)
+
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user (vendor or admin)"""
@@ -28,7 +61,8 @@ def register():
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
         # Check if user already exists
-        if User.query.filter_by(email=data['email']).first():
+        email = _normalize_email(data['email'])
+        if db.session.scalar(_EMAIL_TAKEN, {'email': email}):
             return jsonify({'error': 'Email already registered'}), 409
         
         # Validate role
@@ -38,7 +72,7 @@ def register():
         
         # Create new user
         user = User(
-            email=data['email'],
+            email=email,
             full_name=data['full_name'],
             role=role,
             phone=data.get('phone'),
@@ -49,6 +83,7 @@ def register():
         
         db.session.add(user)
         db.session.commit()
+        _unknown_email_cache.pop(user.email)
         
         # Create access token
         access_token = create_access_token(identity=str(user.id))
@@ -77,9 +112,19 @@ def login():
         role = data.get('role')  # 'vendor' or 'admin'
         
         # Find user
-        user = User.query.filter_by(email=data['email']).first()
+        user = None
+        email = _normalize_email(data['email'])
+        if _unknown_email_cache.get(email) is None:
+            user = db.session.scalars(_USER_BY_EMAIL, {'email': email}).first()
+            if not user:
+                _unknown_email_cache.set(email, True)
         
         if not user:
+            # Hash anyway so response time doesn't reveal whether the account exists
+            check_password_hash(
+                _dummy_password_hash(current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt')),
+                data['password']
+            )
             return jsonify({'error': 'Invalid email or password'}), 401
         
         # Check password
@@ -94,16 +139,25 @@ def login():
         if role and user.role != role:
             return jsonify({'error': f'Invalid credentials for {role} login'}), 401
         
+        user_data = user.to_dict()
+        
+        # The plaintext is only available here, so move hashes made with an
+        # older (or costlier) method onto the configured one as users log in
+        if user.password_needs_rehash():
+            user.set_password(data['password'])
+            db.session.commit()
+        
         # Create access token
         access_token = create_access_token(identity=str(user.id))
         
         return jsonify({
             'message': 'Login successful',
-            'user': user.to_dict(),
+            'user': user_data,
             'access_token': access_token
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/me', methods=['GET'])
@@ -114,12 +168,15 @@ def get_current_user():
         current_user_id = _current_user_id()
         if current_user_id is None:
             return jsonify({'error': 'Invalid token'}), 401
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user_data = _user_payload_cache.get(current_user_id)
+        if user_data is None:
+            user = db.session.get(User, current_user_id)
+            if not user:
+                return jsonify({'error': 'User not found'}), 404
+            user_data = user.to_dict()
+            _user_payload_cache.set(current_user_id, user_data)
         
-        return jsonify(user.to_dict()), 200
+        return jsonify(user_data), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -155,6 +212,7 @@ def update_profile():
         
         user.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_user(user.id)
         
         return jsonify({
             'message': 'Profile updated successfully',
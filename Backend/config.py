@@ -1,23 +1,56 @@
 import os
 from datetime import timedelta
+from functools import cache
+from urllib.parse import urlsplit
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 SQLITE_DEV_PATH = os.path.join(BASE_DIR, 'instance', 'eventflow_dev.db')
 
+# Bare PostgreSQL schemes that SQLAlchemy would otherwise map to psycopg2
+_POSTGRES_SCHEMES = frozenset({'postgres', 'postgresql'})
+
 def _normalize_database_url(url: str) -> str:
     if not url:
         return url
-    if url.startswith('postgres://'):
-        return url.replace('postgres://', 'postgresql+psycopg://', 1)
-    if url.startswith('postgresql://'):
-        return url.replace('postgresql://', 'postgresql+psycopg://', 1)
+    scheme = urlsplit(url).scheme
+    if scheme in _POSTGRES_SCHEMES:
+        # Splice the scheme rather than urlunsplit(), which collapses
+        # socket URLs like postgresql:///db
+        return 'postgresql+psycopg' + url[len(scheme):]
     return url
 
+@cache
+def _build_uri(database_url, driver, user, password, host, port, name, query='') -> str:
+    return _normalize_database_url(database_url) or (
+        f"{driver}://{user}:{password}@{host}:{port}/{name}{query}"
+    )
+
+def _engine_options(database_uri: str) -> dict:
+    options = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE') or 20),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW') or 40),
+        'pool_pre_ping': True,
+        # Recycle before server/proxy idle timeouts, and reuse the most
+        # recently returned connection so idle ones can time out at the server
+        'pool_recycle': 1800,
+        'pool_use_lifo': True,
+        # Room for every distinct statement the API compiles (default is 500)
+        'query_cache_size': 1200
+    }
+    if database_uri.startswith('postgresql+psycopg') and os.environ.get('DB_PGBOUNCER'):
+        # PgBouncer in transaction mode hands each transaction a different
+        # server connection, which breaks psycopg's server-side prepared statements
+        options['connect_args'] = {'prepare_threshold': None}
+    return options
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    # Werkzeug hash method for new passwords, e.g. 'scrypt:16384:8:1' or
+    # 'pbkdf2:sha256:600000'; existing hashes keep verifying either way
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt'
     
     DATABASE_URL = os.environ.get('DATABASE_URL')
     DB_HOST = os.environ.get('DB_HOST') or 'localhost'
@@ -27,13 +60,19 @@ class Config:
     DB_NAME = os.environ.get('DB_NAME') or 'eventflow_db'
     DB_DRIVER = os.environ.get('DB_DRIVER') or 'postgresql+psycopg'
 
-    SQLALCHEMY_DATABASE_URI = _normalize_database_url(DATABASE_URL) or (
-        f"{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    SQLALCHEMY_DATABASE_URI = _build_uri(
+        DATABASE_URL, DB_DRIVER, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME
     )
+    SQLALCHEMY_ENGINE_OPTIONS = _engine_options(SQLALCHEMY_DATABASE_URI)
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    SQLALCHEMY_RECORD_QUERIES = True
     SQLALCHEMY_DATABASE_URI = f"sqlite:///{SQLITE_DEV_PATH}"
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'query_cache_size': 1200
+    }
 
 class PostgresConfig(Config):
     DEBUG = True
@@ -41,9 +80,38 @@ class PostgresConfig(Config):
 class ProductionConfig(Config):
     DEBUG = False
 
+class TestingConfig(Config):
+    TESTING = True
+    # In-memory SQLite unless pointed at a real server
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+
+class MySQLConfig(Config):
+    """MySQL via mysqlclient, using the same DB_* variables as setup_mysql.py"""
+    SQLALCHEMY_DATABASE_URI = _build_uri(
+        os.environ.get('DATABASE_URL'),
+        # mysqlclient encodes parameters and decodes rows in C; set
+        # DB_DRIVER=mysql+pymysql where it can't be built
+        os.environ.get('DB_DRIVER') or 'mysql+mysqldb',
+        os.environ.get('DB_USER') or 'root',
+        os.environ.get('DB_PASSWORD') or '',
+        os.environ.get('DB_HOST') or 'localhost',
+        os.environ.get('DB_PORT') or '3306',
+        os.environ.get('DB_NAME') or 'eventflow_db',
+        '?charset=utf8mb4'
+    )
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **_engine_options(SQLALCHEMY_DATABASE_URI),
+        # Stay under MySQL's wait_timeout (often lowered to 300s on hosted
+        # servers) so the pool never hands out a connection the server dropped
+        'pool_recycle': 280
+    }
+
 config = {
     'development': DevelopmentConfig,
     'postgres': PostgresConfig,
     'production': ProductionConfig,
+    'mysql': MySQLConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -0,0 +1,46 @@
+from datetime import datetime
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # fall back to Flask's stdlib-based provider
+    orjson = None
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider, writing datetimes as ISO 8601 like orjson does and money as numbers"""
+
+    @staticmethod
+    def default(o):
+        # Flask would otherwise render datetimes as HTTP dates
+        if isinstance(o, datetime):
+            return o.isoformat()
+        # Numeric columns load as Decimal; clients expect JSON numbers, not strings
+        if isinstance(o, Decimal):
+            return float(o)
+        return DefaultJSONProvider.default(o)
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider that encodes with orjson instead of the stdlib json module"""
+
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
+def init_json(app):
+    """Use orjson for request and response bodies when it is installed"""
+    app.json = ORJSONProvider(app) if orjson is not None else JSONProvider(app)
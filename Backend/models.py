@@ -1,12 +1,136 @@
 from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+from flask import current_app, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
-class User(db.Model):
+
+def _utcnow():
+    """Current UTC time, read once per request so rows flushed together share a timestamp"""
+    if not has_request_context():
+        return datetime.utcnow()
+    if '_now' not in g:
+        g._now = datetime.utcnow()
+    return g._now
+
+
+class UTCNow(FunctionElement):
+    """The database's current UTC time, for column server defaults"""
+    type = db.DateTime()
+    inherit_cache = True
+
+
+@compiles(UTCNow)
+def _compile_utcnow(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(UTCNow, 'postgresql')
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    return "(CURRENT_TIMESTAMP AT TIME ZONE 'utc')"
+
+
+@compiles(UTCNow, 'mysql')
+def _compile_utcnow_mysql(element, compiler, **kw):
+    return '(UTC_TIMESTAMP())'
+
+
+class CaseFolded(FunctionElement):
+    """A string column lowercased for case-insensitive matching, as ix_users_email_lower indexes it"""
+    type = db.String()
+    inherit_cache = True
+
+
+@compiles(CaseFolded)
+def _compile_case_folded(element, compiler, **kw):
+    return 'lower(%s)' % compiler.process(element.clauses, **kw)
+
+
+@compiles(CaseFolded, 'mysql')
+def _compile_case_folded_mysql(element, compiler, **kw):
+    # The default _ci collation already compares case-insensitively, and the
+    # bare column keeps using the UNIQUE key on databases without the
+    # expression index
+    return compiler.process(element.clauses, **kw)
+
+
+class MonthKey(FunctionElement):
+    """A datetime column's calendar month as 'YYYY-MM', for grouping rows by month"""
+    type = db.String()
+    inherit_cache = True
+
+
+# The formats go through text() so drivers with format paramstyles get their % escaped
+@compiles(MonthKey)
+def _compile_month_key(element, compiler, **kw):
+    return 'strftime(%s, %s)' % (compiler.process(db.text("'%Y-%m'"), **kw), compiler.process(element.clauses, **kw))
+
+
+@compiles(MonthKey, 'postgresql')
+def _compile_month_key_postgresql(element, compiler, **kw):
+    return "to_char(date_trunc('month', %s), 'YYYY-MM')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(MonthKey, 'mysql')
+def _compile_month_key_mysql(element, compiler, **kw):
+    return 'DATE_FORMAT(%s, %s)' % (compiler.process(element.clauses, **kw), compiler.process(db.text("'%Y-%m'"), **kw))
+
+
+@lru_cache(maxsize=8)
+def _password_hash_prefix(method):
+    """The 'method:params' prefix Werkzeug writes for a configured hash method"""
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
+class CachedLookupMixin:
+    """Primary-key lookups memoized on flask.g for the rest of the request"""
+
+    @classmethod
+    def get_cached(cls, object_id):
+        cache = g.setdefault('_obj_cache', {})
+        key = (cls, object_id)
+        if key not in cache:
+            cache[key] = db.session.get(cls, object_id)
+        return cache[key]
+
+
+class SerializedRowMixin:
+    """to_dict() from a declared field spec"""
+
+    # Column attributes serialized as-is, in output order
+    _DICT_FIELDS = ()
+    # (relationship, ((key, attribute, default when the relationship is empty), ...))
+    _RELATED_DICT_FIELDS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # One C-level getter per model reads every field in a single call
+        cls._dict_values = staticmethod(attrgetter(*cls._DICT_FIELDS))
+
+    def to_dict(self):
+        """Convert the row, plus fields from its related rows, to a dictionary"""
+        data = dict(zip(self._DICT_FIELDS, self._dict_values(self)))
+        for relationship, fields in self._RELATED_DICT_FIELDS:
+            related = getattr(self, relationship)
+            for key, attribute, default in fields:
+                data[key] = default if related is None else getattr(related, attribute)
+        return data
+
+class User(CachedLookupMixin, SerializedRowMixin, db.Model):
     """User model for both vendors and admins"""
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_role_active', 'role', 'is_active'),
+        # Backs the case-insensitive email lookups in auth_routes; MySQL needs
+        # its own functional-index syntax (see mysql_schema.sql)
+        db.Index('ix_users_email_lower', db.text('lower(email)')).ddl_if(dialect=('postgresql', 'sqlite')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
@@ -16,89 +140,97 @@ class User(db.Model):
     phone = db.Column(db.String(20))
     company_name = db.Column(db.String(150))
     business_type = db.Column(db.String(100))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow, server_default=UTCNow())
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow, server_default=UTCNow())
     is_active = db.Column(db.Boolean, default=True)
     
     # Relationships
-    applications = db.relationship('VendorApplication', backref='vendor', lazy=True, cascade='all, delete-orphan', foreign_keys='VendorApplication.vendor_id')
-    payments = db.relationship('Payment', backref='vendor', lazy=True, cascade='all, delete-orphan', foreign_keys='Payment.vendor_id')
+    applications = db.relationship('VendorApplication', back_populates='vendor', lazy=True, cascade='all, delete-orphan', foreign_keys='VendorApplication.vendor_id')
+    payments = db.relationship('Payment', back_populates='vendor', lazy=True, cascade='all, delete-orphan', foreign_keys='Payment.vendor_id')
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        # hashlib's scrypt/pbkdf2 release the GIL, so other request threads
+        # keep running while a hash is computed
+        self.password_hash = generate_password_hash(
+            password, method=current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        )
     
     def check_password(self, password):
         """Check password against hash"""
         return check_password_hash(self.password_hash, password)
     
-    def to_dict(self):
-        """Convert user to dictionary"""
-        return {
-            'id': self.id,
-            'email': self.email,
-            'full_name': self.full_name,
-            'role': self.role,
-            'phone': self.phone,
-            'company_name': self.company_name,
-            'business_type': self.business_type,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'is_active': self.is_active
-        }
-
-class Event(db.Model):
+    def password_needs_rehash(self):
+        """True if the stored hash was made with a different method or cost than configured"""
+        method = current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        return self.password_hash.split('$', 1)[0] != _password_hash_prefix(method)
+    
+    _DICT_FIELDS = (
+        'id', 'email', 'full_name', 'role', 'phone', 'company_name',
+        'business_type', 'created_at', 'is_active'
+    )
+
+class Event(CachedLookupMixin, SerializedRowMixin, db.Model):
     """Event model"""
     __tablename__ = 'events'
+    __table_args__ = (
+        db.Index('ix_events_admin_date', 'created_by_admin_id', 'event_date'),
+        # Public listing: status IN (...) ORDER BY event_date
+        db.Index('ix_events_status_date', 'status', 'event_date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text)
+    description = db.deferred(db.Column(db.Text), group='long_text')
     event_date = db.Column(db.DateTime, nullable=False)
     location = db.Column(db.String(200))
     venue = db.Column(db.String(200))
     expected_attendees = db.Column(db.Integer)
-    vendor_fee = db.Column(db.Float, default=0.0)
+    vendor_fee = db.Column(db.Numeric(12, 2), default=0)
     status = db.Column(db.String(20), default='upcoming')  # 'upcoming', 'ongoing', 'completed', 'cancelled'
     created_by_admin_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    created_by_admin = db.relationship('User', foreign_keys=[created_by_admin_id], lazy='joined')
+    # Loaded on demand; admin endpoints that render admin_email opt in with joinedload
+    created_by_admin = db.relationship('User', foreign_keys=[created_by_admin_id])
     default_currency = db.Column(db.String(10), default='USD')
     currency_options = db.Column(db.String(120), default='USD')  # comma-separated list, e.g. USD,KES
     mpesa_number = db.Column(db.String(40))
     paypal_account = db.Column(db.String(120))
     zelle_account = db.Column(db.String(120))
     card_instructions = db.Column(db.String(255))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow, server_default=UTCNow())
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow, server_default=UTCNow())
     
     # Relationships
-    applications = db.relationship('VendorApplication', backref='event', lazy=True, cascade='all, delete-orphan')
+    applications = db.relationship('VendorApplication', back_populates='event', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        """Convert event to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'event_date': self.event_date.isoformat() if self.event_date else None,
-            'location': self.location,
-            'venue': self.venue,
-            'expected_attendees': self.expected_attendees,
-            'vendor_fee': self.vendor_fee,
-            'status': self.status,
-            'created_by_admin_id': self.created_by_admin_id,
-            'admin_email': self.created_by_admin.email if self.created_by_admin else None,
-            'default_currency': self.default_currency,
-            'currency_options': self.currency_options,
-            'mpesa_number': self.mpesa_number,
-            'paypal_account': self.paypal_account,
-            'zelle_account': self.zelle_account,
-            'card_instructions': self.card_instructions,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
-
-class VendorApplication(db.Model):
+    _DICT_FIELDS = (
+        'id', 'name', 'description', 'event_date', 'location', 'venue',
+        'expected_attendees', 'vendor_fee', 'status', 'created_by_admin_id',
+        'default_currency', 'currency_options', 'mpesa_number', 'paypal_account',
+        'zelle_account', 'card_instructions', 'created_at'
+    )
+    _RELATED_DICT_FIELDS = (
+        ('created_by_admin', (('admin_email', 'email', None),)),
+    )
+
+class VendorApplication(SerializedRowMixin, db.Model):
     """Vendor application for events"""
     __tablename__ = 'vendor_applications'
+    __table_args__ = (
+        db.Index('ix_vendor_applications_event_status', 'event_id', 'status'),
+        # Vendor dashboard/listing: vendor_id = ? [AND status = ?]
+        db.Index('ix_vendor_applications_vendor_status', 'vendor_id', 'status'),
+        # Partial indexes back the per-status counts; MySQL has no partial
+        # indexes, so they are only created on PostgreSQL and SQLite
+        *(
+            db.Index(
+                f'ix_vendor_applications_{status}', 'event_id',
+                postgresql_where=db.text(f"status = '{status}'"),
+                sqlite_where=db.text(f"status = '{status}'")
+            ).ddl_if(dialect=('postgresql', 'sqlite'))
+            for status in ('pending', 'approved', 'rejected')
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     vendor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -106,58 +238,63 @@ class VendorApplication(db.Model):
     
     # Application details
     product_service = db.Column(db.String(200), nullable=False)
-    booth_requirements = db.Column(db.Text)
-    additional_notes = db.Column(db.Text)
+    # Free-text columns stay out of plain loads; endpoints that serialize
+    # them undefer the 'long_text' group
+    booth_requirements = db.deferred(db.Column(db.Text), group='long_text')
+    additional_notes = db.deferred(db.Column(db.Text), group='long_text')
     
     # Status tracking
     status = db.Column(db.String(20), default='pending')  # 'pending', 'approved', 'rejected', 'withdrawn'
-    admin_notes = db.Column(db.Text)
+    admin_notes = db.deferred(db.Column(db.Text), group='long_text')
     reviewed_at = db.Column(db.DateTime)
     reviewed_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     
     # Timestamps
-    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    applied_at = db.Column(db.DateTime, default=_utcnow, server_default=UTCNow())
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow, server_default=UTCNow())
     
     # Relationships
-    payments = db.relationship('Payment', backref='application', lazy=True, cascade='all, delete-orphan')
+    vendor = db.relationship('User', back_populates='applications', foreign_keys=[vendor_id])
+    # to_dict() always reads the event, so load it for a whole batch of applications at once
+    event = db.relationship('Event', back_populates='applications', lazy='selectin')
+    payments = db.relationship('Payment', back_populates='application', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
-        """Convert application to dictionary"""
-        return {
-            'id': self.id,
-            'vendor_id': self.vendor_id,
-            'vendor_name': self.vendor.full_name if self.vendor else None,
-            'vendor_company': self.vendor.company_name if self.vendor else None,
-            'event_id': self.event_id,
-            'event_name': self.event.name if self.event else None,
-            'event_date': self.event.event_date.isoformat() if self.event and self.event.event_date else None,
-            'product_service': self.product_service,
-            'booth_requirements': self.booth_requirements,
-            'additional_notes': self.additional_notes,
-            'status': self.status,
-            'admin_notes': self.admin_notes,
-            'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
-            'applied_at': self.applied_at.isoformat() if self.applied_at else None,
-            'vendor_fee': self.event.vendor_fee if self.event else 0,
-            'default_currency': self.event.default_currency if self.event else 'USD',
-            'currency_options': self.event.currency_options if self.event else 'USD',
-            'mpesa_number': self.event.mpesa_number if self.event else None,
-            'paypal_account': self.event.paypal_account if self.event else None,
-            'zelle_account': self.event.zelle_account if self.event else None,
-            'card_instructions': self.event.card_instructions if self.event else None
-        }
-
-class Payment(db.Model):
+    _DICT_FIELDS = (
+        'id', 'vendor_id', 'event_id', 'product_service', 'booth_requirements',
+        'additional_notes', 'status', 'admin_notes', 'reviewed_at', 'applied_at'
+    )
+    _RELATED_DICT_FIELDS = (
+        ('vendor', (
+            ('vendor_name', 'full_name', None),
+            ('vendor_company', 'company_name', None),
+        )),
+        ('event', (
+            ('event_name', 'name', None),
+            ('event_date', 'event_date', None),
+            ('vendor_fee', 'vendor_fee', 0),
+            ('default_currency', 'default_currency', 'USD'),
+            ('currency_options', 'currency_options', 'USD'),
+            ('mpesa_number', 'mpesa_number', None),
+            ('paypal_account', 'paypal_account', None),
+            ('zelle_account', 'zelle_account', None),
+            ('card_instructions', 'card_instructions', None),
+        )),
+    )
+
+class Payment(SerializedRowMixin, db.Model):
     """Payment tracking for vendor applications"""
     __tablename__ = 'payments'
+    __table_args__ = (
+        db.Index('uq_payments_application_id', 'application_id', unique=True),
+        db.Index('ix_payments_vendor_status', 'vendor_id', 'status'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     application_id = db.Column(db.Integer, db.ForeignKey('vendor_applications.id'), nullable=False)
     vendor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Payment details
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(db.Numeric(12, 2), nullable=False)
     payment_method = db.Column(db.String(50))  # 'credit_card', 'bank_transfer', 'cash', etc.
     transaction_id = db.Column(db.String(100), unique=True)
     status = db.Column(db.String(20), default='pending')  # 'pending', 'completed', 'failed', 'refunded'
@@ -166,27 +303,21 @@ class Payment(db.Model):
     
     # Timestamps
     payment_date = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=_utcnow, server_default=UTCNow())
+    updated_at = db.Column(db.DateTime, default=_utcnow, onupdate=_utcnow, server_default=UTCNow())
     
     # Notes
-    notes = db.Column(db.Text)
+    notes = db.deferred(db.Column(db.Text), group='long_text')
     
-    def to_dict(self):
-        """Convert payment to dictionary"""
-        return {
-            'id': self.id,
-            'application_id': self.application_id,
-            'vendor_id': self.vendor_id,
-            'vendor_name': self.vendor.full_name if self.vendor else None,
-            'amount': self.amount,
-            'payment_method': self.payment_method,
-            'transaction_id': self.transaction_id,
-            'status': self.status,
-            'currency': self.currency,
-            'pay_to': self.pay_to,
-            'payment_date': self.payment_date.isoformat() if self.payment_date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'notes': self.notes
-        }
- 
+    # Relationships
+    application = db.relationship('VendorApplication', back_populates='payments')
+    vendor = db.relationship('User', back_populates='payments', foreign_keys=[vendor_id])
+    
+    _DICT_FIELDS = (
+        'id', 'application_id', 'vendor_id', 'amount', 'payment_method',
+        'transaction_id', 'status', 'currency', 'pay_to', 'payment_date',
+        'created_at', 'notes'
+    )
+    _RELATED_DICT_FIELDS = (
+        ('vendor', (('vendor_name', 'full_name', None),)),
+    )
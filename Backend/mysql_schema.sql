@@ -10,8 +10,9 @@ CREATE TABLE IF NOT EXISTS users (
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     is_active BOOLEAN NOT NULL DEFAULT TRUE,
-    INDEX idx_users_email (email),
     INDEX idx_users_role (role),
+    INDEX ix_users_role_active (role, is_active),
+    INDEX ix_users_email_lower ((lower(email))),
     CONSTRAINT chk_users_role CHECK (role IN ('vendor', 'admin'))
 );
 
@@ -23,7 +24,7 @@ CREATE TABLE IF NOT EXISTS events (
     location VARCHAR(200),
     venue VARCHAR(200),
     expected_attendees INT,
-    vendor_fee DOUBLE NOT NULL DEFAULT 0,
+    vendor_fee DECIMAL(12,2) NOT NULL DEFAULT 0,
     status VARCHAR(20) NOT NULL DEFAULT 'upcoming',
     created_by_admin_id INT NOT NULL,
     default_currency VARCHAR(10) NOT NULL DEFAULT 'USD',
@@ -37,6 +38,8 @@ CREATE TABLE IF NOT EXISTS events (
     INDEX idx_events_date (event_date),
     INDEX idx_events_status (status),
     INDEX idx_events_admin_owner (created_by_admin_id),
+    INDEX ix_events_admin_date (created_by_admin_id, event_date),
+    INDEX ix_events_status_date (status, event_date),
     CONSTRAINT fk_events_admin_owner FOREIGN KEY (created_by_admin_id) REFERENCES users(id),
     CONSTRAINT chk_events_status CHECK (status IN ('upcoming', 'ongoing', 'completed', 'cancelled'))
 );
@@ -58,6 +61,8 @@ CREATE TABLE IF NOT EXISTS vendor_applications (
     INDEX idx_vendor_applications_vendor (vendor_id),
     INDEX idx_vendor_applications_event (event_id),
     INDEX idx_vendor_applications_status (status),
+    INDEX ix_vendor_applications_event_status (event_id, status),
+    INDEX ix_vendor_applications_vendor_status (vendor_id, status),
     CONSTRAINT fk_vendor_applications_vendor FOREIGN KEY (vendor_id) REFERENCES users(id),
     CONSTRAINT fk_vendor_applications_event FOREIGN KEY (event_id) REFERENCES events(id),
     CONSTRAINT fk_vendor_applications_reviewer FOREIGN KEY (reviewed_by) REFERENCES users(id),
@@ -68,7 +73,7 @@ CREATE TABLE IF NOT EXISTS payments (
     id INT AUTO_INCREMENT PRIMARY KEY,
     application_id INT NOT NULL,
     vendor_id INT NOT NULL,
-    amount DOUBLE NOT NULL,
+    amount DECIMAL(12,2) NOT NULL,
     payment_method VARCHAR(50),
     transaction_id VARCHAR(100) UNIQUE,
     status VARCHAR(20) NOT NULL DEFAULT 'pending',
@@ -79,8 +84,9 @@ CREATE TABLE IF NOT EXISTS payments (
     updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     notes TEXT,
     INDEX idx_payments_vendor (vendor_id),
-    INDEX idx_payments_application (application_id),
+    UNIQUE KEY uq_payments_application_id (application_id),
     INDEX idx_payments_status (status),
+    INDEX ix_payments_vendor_status (vendor_id, status),
     CONSTRAINT fk_payments_application FOREIGN KEY (application_id) REFERENCES vendor_applications(id),
     CONSTRAINT fk_payments_vendor FOREIGN KEY (vendor_id) REFERENCES users(id),
     CONSTRAINT chk_payments_status CHECK (status IN ('pending', 'completed', 'failed', 'refunded'))
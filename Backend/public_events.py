@@ -0,0 +1,84 @@
+from flask import current_app
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from models import db, User, Event
+from cache import TTLCache
+
+PUBLIC_EVENTS_TTL = 30
+
+# Public events listing as a column projection: the endpoint is read-only,
+# so there is no need to hydrate ORM objects just to call to_dict()
+_PUBLIC_EVENTS = select(
+    *(getattr(Event, name) for name in Event._DICT_FIELDS),
+    User.email.label('admin_email')
+).outerjoin(
+    User, Event.created_by_admin_id == User.id
+).where(
+    Event.status.in_(['upcoming', 'ongoing'])
+).order_by(Event.event_date.asc())
+
+
+def _public_event_row_to_dict(row):
+    """Serialize a projected event row the same way as Event.to_dict()"""
+    return row._asdict()
+
+
+# Listing rows and their serialized body; both are the same for every caller
+_public_events_cache = TTLCache(maxsize=2, ttl=PUBLIC_EVENTS_TTL)
+
+
+def _fill_generation(generation):
+    """The cache generation the rows just read can be stored under
+
+    Under REPEATABLE READ the rows come from the snapshot of the session's
+    transaction, which may have begun before a commit cleared the cache.
+    """
+    session = db.session()
+    if session.in_transaction():
+        return min(generation, session.info.get('public_events_generation', generation))
+    return generation
+
+
+def get_public_events():
+    """Return the public events listing as a list of dicts, from cache when fresh"""
+    generation = _public_events_cache.generation
+    events = _public_events_cache.get('rows')
+    if events is None:
+        events = [_public_event_row_to_dict(row) for row in db.session.execute(_PUBLIC_EVENTS)]
+        # A commit that cleared the cache mid-query may not be in these rows
+        _public_events_cache.set('rows', events, _fill_generation(generation))
+    return events
+
+
+def get_public_events_body():
+    """Return the public events listing as a JSON string, from cache when fresh"""
+    generation = _public_events_cache.generation
+    body = _public_events_cache.get('body')
+    if body is None:
+        body = current_app.json.dumps(get_public_events())
+        _public_events_cache.set('body', body, _fill_generation(generation))
+    return body
+
+
+@event.listens_for(Session, 'after_begin')
+def _note_cache_generation(session, transaction, connection):
+    # Taken before the transaction's first read, so before its snapshot
+    session.info['public_events_generation'] = _public_events_cache.generation
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_event_changes(session, flush_context):
+    if any(isinstance(obj, Event) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['public_events_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_public_events(session):
+    # Other workers still serve their copy until it expires (PUBLIC_EVENTS_TTL)
+    if session.info.pop('public_events_changed', False):
+        _public_events_cache.clear()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_event_changes(session):
+    session.info.pop('public_events_changed', None)
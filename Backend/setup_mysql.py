@@ -1,6 +1,8 @@
 import os
+from contextlib import contextmanager
+
 import pymysql
-from pymysql.err import OperationalError, ProgrammingError
+from pymysql.constants import CLIENT
 
 from app import create_app, init_db
 
@@ -10,35 +12,35 @@ def get_env(name, default):
     return value if value not in (None, "") else default
 
 
-def create_database_if_missing():
-    host = get_env("DB_HOST", "localhost")
-    port = int(get_env("DB_PORT", "3306"))
-    user = get_env("DB_USER", "root")
-    password = get_env("DB_PASSWORD", "")
-    db_name = get_env("DB_NAME", "eventflow_db")
-
+@contextmanager
+def _mysql():
+    """One server connection for the whole setup run; each step reuses it"""
     connection = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        port=port,
+        host=get_env("DB_HOST", "localhost"),
+        user=get_env("DB_USER", "root"),
+        password=get_env("DB_PASSWORD", ""),
+        port=int(get_env("DB_PORT", "3306")),
         autocommit=True,
+        # Lets the schema file and the alters go out in one round-trip each
+        client_flag=CLIENT.MULTI_STATEMENTS,
     )
     try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                f"CREATE DATABASE IF NOT EXISTS `{db_name}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
-            )
+        yield connection
     finally:
         connection.close()
 
-def apply_schema_file():
-    host = get_env("DB_HOST", "localhost")
-    port = int(get_env("DB_PORT", "3306"))
-    user = get_env("DB_USER", "root")
-    password = get_env("DB_PASSWORD", "")
+
+def create_database_if_missing(connection):
     db_name = get_env("DB_NAME", "eventflow_db")
 
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE DATABASE IF NOT EXISTS `{db_name}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
+        )
+    # Same as USE, so the following steps run against the new database
+    connection.select_db(db_name)
+
+def apply_schema_file(connection):
     schema_path = os.path.join(os.path.dirname(__file__), "mysql_schema.sql")
     if not os.path.exists(schema_path):
         return
@@ -46,73 +48,96 @@ def apply_schema_file():
     with open(schema_path, "r", encoding="utf-8") as f:
         schema_sql = f.read()
 
-    connection = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        port=port,
-        database=db_name,
-        autocommit=True,
-    )
-    try:
-        with connection.cursor() as cursor:
-            for statement in schema_sql.split(";"):
-                sql = statement.strip()
-                if sql:
-                    cursor.execute(sql)
-    finally:
-        connection.close()
+    with connection.cursor() as cursor:
+        cursor.execute(schema_sql)
+        # Drain every statement's result so errors surface here
+        while cursor.nextset():
+            pass
 
-def apply_incremental_alters():
-    host = get_env("DB_HOST", "localhost")
-    port = int(get_env("DB_PORT", "3306"))
-    user = get_env("DB_USER", "root")
-    password = get_env("DB_PASSWORD", "")
+def apply_incremental_alters(connection):
     db_name = get_env("DB_NAME", "eventflow_db")
 
-    alters = [
-        "ALTER TABLE events ADD COLUMN created_by_admin_id INT NULL",
-        "ALTER TABLE events ADD COLUMN default_currency VARCHAR(10) NOT NULL DEFAULT 'USD'",
-        "ALTER TABLE events ADD COLUMN currency_options VARCHAR(120) NOT NULL DEFAULT 'USD'",
-        "ALTER TABLE events ADD COLUMN mpesa_number VARCHAR(40)",
-        "ALTER TABLE events ADD COLUMN paypal_account VARCHAR(120)",
-        "ALTER TABLE events ADD COLUMN zelle_account VARCHAR(120)",
-        "ALTER TABLE events ADD COLUMN card_instructions VARCHAR(255)",
-        "UPDATE events SET created_by_admin_id = (SELECT id FROM users WHERE role='admin' ORDER BY id LIMIT 1) WHERE created_by_admin_id IS NULL",
-        "ALTER TABLE events MODIFY COLUMN created_by_admin_id INT NOT NULL",
-        "ALTER TABLE events ADD INDEX idx_events_admin_owner (created_by_admin_id)",
-        "ALTER TABLE events ADD CONSTRAINT fk_events_admin_owner FOREIGN KEY (created_by_admin_id) REFERENCES users(id)",
-        "ALTER TABLE payments ADD COLUMN currency VARCHAR(10) NOT NULL DEFAULT 'USD'",
-        "ALTER TABLE payments ADD COLUMN pay_to VARCHAR(255)"
-    ]
+    with connection.cursor() as cursor:
+        # Read the current schema once, then send only the DDL it still needs
+        cursor.execute(
+            "SELECT TABLE_NAME, COLUMN_NAME, IS_NULLABLE, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ('events', 'payments')",
+            (db_name,),
+        )
+        rows = cursor.fetchall()
+        columns = {(table, column): nullable for table, column, nullable, _ in rows}
+        data_types = {(table, column): data_type.lower() for table, column, _, data_type in rows}
+        cursor.execute(
+            "SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM INFORMATION_SCHEMA.STATISTICS "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ('users', 'events', 'vendor_applications', 'payments')",
+            (db_name,),
+        )
+        indexes = set(cursor.fetchall())
+        cursor.execute(
+            "SELECT CONSTRAINT_NAME FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'events' AND CONSTRAINT_TYPE = 'FOREIGN KEY'",
+            (db_name,),
+        )
+        constraints = {name for name, in cursor.fetchall()}
 
-    connection = pymysql.connect(
-        host=host,
-        user=user,
-        password=password,
-        port=port,
-        database=db_name,
-        autocommit=True,
-    )
-    try:
-        with connection.cursor() as cursor:
-            for sql in alters:
-                try:
-                    cursor.execute(sql)
-                except (OperationalError, ProgrammingError) as e:
-                    # 1060: Duplicate column name
-                    # 1061: Duplicate key name
-                    # 1826: Duplicate foreign key constraint name
-                    if getattr(e, "args", [None])[0] not in (1060, 1061, 1826):
-                        raise
-    finally:
-        connection.close()
+        alters = [
+            sql
+            for (table, column), sql in (
+                (("events", "created_by_admin_id"), "ALTER TABLE events ADD COLUMN created_by_admin_id INT NULL"),
+                (("events", "default_currency"), "ALTER TABLE events ADD COLUMN default_currency VARCHAR(10) NOT NULL DEFAULT 'USD'"),
+                (("events", "currency_options"), "ALTER TABLE events ADD COLUMN currency_options VARCHAR(120) NOT NULL DEFAULT 'USD'"),
+                (("events", "mpesa_number"), "ALTER TABLE events ADD COLUMN mpesa_number VARCHAR(40)"),
+                (("events", "paypal_account"), "ALTER TABLE events ADD COLUMN paypal_account VARCHAR(120)"),
+                (("events", "zelle_account"), "ALTER TABLE events ADD COLUMN zelle_account VARCHAR(120)"),
+                (("events", "card_instructions"), "ALTER TABLE events ADD COLUMN card_instructions VARCHAR(255)"),
+            )
+            if (table, column) not in columns
+        ]
+        if columns.get(("events", "created_by_admin_id"), "YES") == "YES":
+            alters += [
+                "UPDATE events SET created_by_admin_id = (SELECT id FROM users WHERE role='admin' ORDER BY id LIMIT 1) WHERE created_by_admin_id IS NULL",
+                "ALTER TABLE events MODIFY COLUMN created_by_admin_id INT NOT NULL",
+            ]
+        if ("events", "idx_events_admin_owner") not in indexes:
+            alters.append("ALTER TABLE events ADD INDEX idx_events_admin_owner (created_by_admin_id)")
+        if "fk_events_admin_owner" not in constraints:
+            alters.append("ALTER TABLE events ADD CONSTRAINT fk_events_admin_owner FOREIGN KEY (created_by_admin_id) REFERENCES users(id)")
+        if ("payments", "currency") not in columns:
+            alters.append("ALTER TABLE payments ADD COLUMN currency VARCHAR(10) NOT NULL DEFAULT 'USD'")
+        if ("payments", "pay_to") not in columns:
+            alters.append("ALTER TABLE payments ADD COLUMN pay_to VARCHAR(255)")
+        # Money columns were DOUBLE before they became exact DECIMALs
+        if data_types.get(("events", "vendor_fee"), "decimal") != "decimal":
+            alters.append("ALTER TABLE events MODIFY COLUMN vendor_fee DECIMAL(12,2) NOT NULL DEFAULT 0")
+        if data_types.get(("payments", "amount"), "decimal") != "decimal":
+            alters.append("ALTER TABLE payments MODIFY COLUMN amount DECIMAL(12,2) NOT NULL")
+        alters += [
+            sql
+            for index, sql in (
+                (("vendor_applications", "ix_vendor_applications_event_status"), "ALTER TABLE vendor_applications ADD INDEX ix_vendor_applications_event_status (event_id, status)"),
+                (("vendor_applications", "ix_vendor_applications_vendor_status"), "ALTER TABLE vendor_applications ADD INDEX ix_vendor_applications_vendor_status (vendor_id, status)"),
+                (("payments", "ix_payments_vendor_status"), "ALTER TABLE payments ADD INDEX ix_payments_vendor_status (vendor_id, status)"),
+                (("users", "ix_users_email_lower"), "ALTER TABLE users ADD INDEX ix_users_email_lower ((lower(email)))"),
+            )
+            if index not in indexes
+        ]
+        # Duplicated the UNIQUE key on email
+        if ("users", "idx_users_email") in indexes:
+            alters.append("ALTER TABLE users DROP INDEX idx_users_email")
+        # Same duplicate, added by migrate_indexes before it matched indexes by column
+        if ("users", "ix_users_email") in indexes and ("users", "email") in indexes:
+            alters.append("ALTER TABLE users DROP INDEX ix_users_email")
 
+        if alters:
+            cursor.execute(";\n".join(alters))
+            while cursor.nextset():
+                pass
 
 if __name__ == "__main__":
-    create_database_if_missing()
-    apply_schema_file()
-    apply_incremental_alters()
+    with _mysql() as connection:
+        create_database_if_missing(connection)
+        apply_schema_file(connection)
+        apply_incremental_alters(connection)
     app = create_app("mysql")
     init_db(app)
     print("MySQL setup complete.")
@@ -0,0 +1,30 @@
+import unittest
+from app import create_app, init_db
+from models import db
+from public_events import _public_events_cache
+
+
+class AppTestCase(unittest.TestCase):
+    """A seeded in-memory database per test, with helpers for authenticated requests"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.context = self.app.app_context()
+        self.context.push()
+        init_db(self.app)
+        _public_events_cache.clear()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.context.pop()
+
+    def login(self, email, password):
+        response = self.client.post('/api/auth/login', json={'email': email, 'password': password})
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    def login_admin(self):
+        return self.login('admin@eventflow.com', 'admin123')
@@ -0,0 +1,25 @@
+import re
+import unittest
+from tests.support import AppTestCase
+
+_MONTH = re.compile(r'^\d{4}-\d{2}$')
+
+
+class AnalyticsDashboardTest(AppTestCase):
+
+    def test_dashboard_groups_by_month_on_sqlite(self):
+        response = self.client.get('/api/admin/analytics/dashboard', headers=self.login_admin())
+
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        data = response.get_json()
+        self.assertEqual(
+            sorted(row['status'] for row in data['applications_by_status']), ['approved', 'pending']
+        )
+        # The sample applications are all applied today
+        self.assertEqual(len(data['applications_over_time']), 1)
+        for row in data['applications_over_time'] + data['revenue_by_month']:
+            self.assertRegex(row['month'], _MONTH)
+
+
+if __name__ == '__main__':
+    unittest.main()
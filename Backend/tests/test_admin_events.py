@@ -0,0 +1,36 @@
+import unittest
+from tests.support import AppTestCase
+
+
+class EventFeeTest(AppTestCase):
+
+    def create_event(self, **fields):
+        return self.client.post('/api/admin/events', headers=self.login_admin(), json={
+            'name': 'Night Market', 'event_date': '2027-01-01T10:00:00', **fields
+        })
+
+    def test_fee_rounds_half_up_to_cents(self):
+        response = self.create_event(vendor_fee=12.345)
+
+        self.assertEqual(response.status_code, 201, response.get_data(as_text=True))
+        self.assertEqual(response.get_json()['event']['vendor_fee'], 12.35)
+
+    def test_non_numeric_fees_are_rejected(self):
+        for fee in ('abc', 'NaN', 'Infinity'):
+            with self.subTest(fee=fee):
+                response = self.create_event(vendor_fee=fee)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json(), {'error': 'Invalid vendor_fee'})
+
+    def test_update_rejects_non_numeric_fee(self):
+        headers = self.login_admin()
+        event_id = self.create_event().get_json()['event']['id']
+
+        response = self.client.put(f'/api/admin/events/{event_id}', headers=headers, json={'vendor_fee': 'NaN'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {'error': 'Invalid vendor_fee'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from models import db, Event
+from public_events import _public_events_cache, get_public_events
+from tests.support import AppTestCase
+
+
+class PublicEventsCacheTest(AppTestCase):
+
+    def add_event(self, name):
+        # A separate session, standing in for another request or worker
+        with Session(db.engine) as other:
+            other.add(Event(name=name, event_date=datetime(2027, 1, 1), created_by_admin_id=1))
+            other.commit()
+
+    def test_miss_caches_the_listing(self):
+        events = get_public_events()
+
+        self.assertIs(_public_events_cache.get('rows'), events)
+
+    def test_commit_after_the_snapshot_is_not_cached_over(self):
+        # The request's transaction (and, on MySQL, its snapshot) starts here
+        db.session.execute(select(Event.id)).all()
+        self.add_event('Committed after the snapshot')
+
+        get_public_events()
+
+        self.assertIsNone(_public_events_cache.get('rows'))
+        db.session.commit()
+        names = [event['name'] for event in get_public_events()]
+        self.assertIn('Committed after the snapshot', names)
+        self.assertIsNotNone(_public_events_cache.get('rows'))
+
+
+if __name__ == '__main__':
+    unittest.main()
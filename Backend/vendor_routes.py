@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, User, Event, VendorApplication, Payment
+from public_events import get_public_events
 from datetime import datetime
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, case
+from sqlalchemy.orm import undefer_group
 from uuid import uuid4
 
 vendor_bp = Blueprint('vendor', __name__)
@@ -23,25 +25,23 @@ def get_available_events():
         current_user_id = _current_user_id()
         if current_user_id is None:
             return jsonify({'error': 'Invalid token'}), 401
-        user = User.query.get(current_user_id)
+        user = User.get_cached(current_user_id)
         
         if user.role != 'vendor':
             return jsonify({'error': 'Access denied'}), 403
         
-        # Get upcoming and ongoing events
-        events = Event.query.filter(
-            Event.status.in_(['upcoming', 'ongoing'])
-        ).order_by(Event.event_date.asc()).all()
+        # Get the events the user has applied to
+        applied_event_ids = {
+            event_id for (event_id,) in db.session.query(VendorApplication.event_id).filter_by(
+                vendor_id=current_user_id
+            )
+        }
         
-        # Get user's applications
-        user_applications = VendorApplication.query.filter_by(vendor_id=current_user_id).all()
-        applied_event_ids = {app.event_id for app in user_applications}
-        
-        events_data = []
-        for event in events:
-            event_dict = event.to_dict()
-            event_dict['has_applied'] = event.id in applied_event_ids
-            events_data.append(event_dict)
+        # Upcoming and ongoing events are the public listing, which is cached
+        events_data = [
+            {**event, 'has_applied': event['id'] in applied_event_ids}
+            for event in get_public_events()
+        ]
         
         return jsonify(events_data), 200
         
@@ -56,12 +56,12 @@ def get_vendor_applications():
         current_user_id = _current_user_id()
         if current_user_id is None:
             return jsonify({'error': 'Invalid token'}), 401
-        user = User.query.get(current_user_id)
+        user = User.get_cached(current_user_id)
         
         if user.role != 'vendor':
             return jsonify({'error': 'Access denied'}), 403
         
-        applications = VendorApplication.query.filter_by(
+        applications = VendorApplication.query.options(undefer_group('long_text')).filter_by(
             vendor_id=current_user_id
         ).order_by(VendorApplication.applied_at.desc()).all()
         
@@ -78,7 +78,7 @@ def submit_application():
         current_user_id = _current_user_id()
         if current_user_id is None:
             return jsonify({'error': 'Invalid token'}), 401
-        user = User.query.get(current_user_id)
+        user = User.get_cached(current_user_id)
         
         if user.role != 'vendor':
             return jsonify({'error': 'Access denied'}), 403
@@ -92,7 +92,7 @@ def submit_application():
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
         # Check if event exists
-        event = Event.query.get(data['event_id'])
+        event = Event.get_cached(data['event_id'])
         if not event:
             return jsonify({'error': 'Event not found'}), 404
         
@@ -115,11 +115,13 @@ def submit_application():
         )
         
         db.session.add(application)
+        db.session.flush()
+        application_data = application.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Application submitted successfully',
-            'application': application.to_dict()
+            'application': application_data
         }), 201
         
     except Exception as e:
@@ -135,7 +137,7 @@ def update_application(application_id):
         if current_user_id is None:
             return jsonify({'error': 'Invalid token'}), 401
         
-        application = VendorApplication.query.get(application_id)
+        application = VendorApplication.query.options(undefer_group('long_text')).get(application_id)
         if not application:
             return jsonify({'error': 'Application not found'}), 404
         
@@ -158,11 +160,12 @@ def update_application(application_id):
             application.additional_notes = data['additional_notes']
         
         application.updated_at = datetime.utcnow()
+        application_data = application.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Application updated successfully',
-            'application': application.to_dict()
+            'application': application_data
         }), 200
         
     except Exception as e:
@@ -208,7 +211,7 @@ def get_dashboard_stats():
         current_user_id = _current_user_id()
         if current_user_id is None:
             return jsonify({'error': 'Invalid token'}), 401
-        user = User.query.get(current_user_id)
+        user = User.get_cached(current_user_id)
         
         if user.role != 'vendor':
             return jsonify({'error': 'Access denied'}), 403
@@ -237,9 +240,10 @@ def get_dashboard_stats():
         ).count()
         
         # Total payments and pending payments
-        payments = Payment.query.filter_by(vendor_id=current_user_id).all()
-        total_paid = sum(p.amount for p in payments if p.status == 'completed')
-        pending_payments = sum(p.amount for p in payments if p.status == 'pending')
+        total_paid, pending_payments = db.session.query(
+            func.coalesce(func.sum(case((Payment.status == 'completed', Payment.amount), else_=0)), 0),
+            func.coalesce(func.sum(case((Payment.status == 'pending', Payment.amount), else_=0)), 0)
+        ).filter(Payment.vendor_id == current_user_id).one()
         
         # Upcoming events (approved applications)
         upcoming_events = VendorApplication.query.join(Event).filter(
@@ -269,12 +273,12 @@ def get_vendor_payments():
         current_user_id = _current_user_id()
         if current_user_id is None:
             return jsonify({'error': 'Invalid token'}), 401
-        user = User.query.get(current_user_id)
+        user = User.get_cached(current_user_id)
         
         if user.role != 'vendor':
             return jsonify({'error': 'Access denied'}), 403
         
-        payments = Payment.query.filter_by(
+        payments = Payment.query.options(undefer_group('long_text')).filter_by(
             vendor_id=current_user_id
         ).order_by(Payment.created_at.desc()).all()
         
@@ -293,11 +297,11 @@ def pay_for_approved_application(payment_id):
         if current_user_id is None:
             return jsonify({'error': 'Invalid token'}), 401
 
-        user = User.query.get(current_user_id)
+        user = User.get_cached(current_user_id)
         if not user or user.role != 'vendor':
             return jsonify({'error': 'Access denied'}), 403
 
-        payment = Payment.query.get(payment_id)
+        payment = Payment.query.options(undefer_group('long_text')).get(payment_id)
         if not payment:
             return jsonify({'error': 'Payment not found'}), 404
 
@@ -353,11 +357,12 @@ def pay_for_approved_application(payment_id):
         payment.status = 'completed'
         payment.payment_date = datetime.utcnow()
         payment.updated_at = datetime.utcnow()
+        payment_data = payment.to_dict()
         db.session.commit()
 
         return jsonify({
             'message': 'Payment completed successfully',
-            'payment': payment.to_dict()
+            'payment': payment_data
         }), 200
     except Exception as e:
         db.session.rollback()
@@ -1,6 +1,9 @@
 import os
-from app import create_app, init_db
+from app import create_app, init_db_locked
 
 config_name = os.environ.get('APP_CONFIG', 'production')
 app = create_app(config_name)
-init_db(app)
\ No newline at end of file
+
+# Set EVENTFLOW_INIT_DB=0 once the schema is managed with `flask init-db`
+if os.environ.get('EVENTFLOW_INIT_DB', '1') != '0':
+    init_db_locked(app)
\ No newline at end of file
@@ -7,8 +7,11 @@ BACKEND_DIR = os.path.join(BASE_DIR, "Backend")
 if BACKEND_DIR not in sys.path:
     sys.path.insert(0, BACKEND_DIR)
 
-from app import create_app, init_db  # noqa: E402
+from app import create_app, init_db_locked  # noqa: E402
 
 config_name = os.environ.get("APP_CONFIG", "production")
 app = create_app(config_name)
-init_db(app)
+
+# Set EVENTFLOW_INIT_DB=0 once the schema is managed with `flask init-db`
+if os.environ.get("EVENTFLOW_INIT_DB", "1") != "0":
+    init_db_locked(app)
@@ -0,0 +1,7 @@
+import os
+
+# The API spends most of each request waiting on database round-trips, so
+# run threaded workers: while one thread waits on PostgreSQL the others keep
+# serving requests. gunicorn still reads PORT and WEB_CONCURRENCY itself.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))